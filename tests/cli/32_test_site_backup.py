@@ -74,7 +74,7 @@ def test_cli_backup_all(monkeypatch):
     from wo.cli.plugins import site_backup as site_backup_mod
     monkeypatch.setattr(site_backup_mod, 'getAllsites', lambda self: sites)
 
-    def fake_backup(self, site, backup_root=None, backup_db=True, backup_files=True):
+    def fake_backup(self, site, siteinfo=None, backup_root=None, backup_db=True, backup_files=True):
         called.append(site)
 
     monkeypatch.setattr(site_backup_mod.WOSiteBackupController, '_backup_site', fake_backup)
@@ -11,6 +11,7 @@ import os
 # Add the project root to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
+from cement.core.controller import IController, controller_validator
 from wo.cli.plugins.site_create import WOSiteCreateController
 
 
@@ -253,10 +254,11 @@ class TestRenderProtectedIntegration(unittest.TestCase):
         with patch('wo.cli.plugins.site_create.os.makedirs') as mock_makedirs:
             with patch('wo.cli.plugins.site_create.WOTemplate') as mock_template:
                 with patch('wo.cli.plugins.site_create.RANDOM') as mock_random:
-                    with patch('wo.cli.plugins.site_create.WOShellExec') as mock_shell:
+                    with patch('wo.cli.plugins.site_create.write_htpasswd') as mock_htpasswd:
                         with patch('wo.cli.plugins.site_create.WOVar') as mock_var:
                             mock_random.long.return_value = 'test_password'
                             mock_var.wo_user = 'testuser'
+                            mock_var.wo_php_user = 'www-data'
 
                             # Execute
                             self.controller._render_protected(data, secure=True)
@@ -264,7 +266,9 @@ class TestRenderProtectedIntegration(unittest.TestCase):
                             # Verify
                             mock_makedirs.assert_called_once()
                             mock_template.deploy.assert_called_once()
-                            mock_shell.cmd_exec.assert_called_once()
+                            mock_htpasswd.assert_called_once_with(
+                                '/etc/nginx/acl/test-site/credentials',
+                                'testuser', 'test_password', group='www-data')
 
     def test_render_protected_without_pool_name(self):
         """Test protected rendering without pool name (should return early)"""
@@ -278,5 +282,15 @@ class TestRenderProtectedIntegration(unittest.TestCase):
             mock_makedirs.assert_not_called()
 
 
+class TestSiteCreateControllerMeta(unittest.TestCase):
+    """The controller must pass cement's interface validation to register"""
+
+    def test_controller_validates(self):
+        controller_validator(IController, WOSiteCreateController())
+
+    def test_arguments_is_list(self):
+        self.assertIsInstance(WOSiteCreateController.Meta.arguments, list)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
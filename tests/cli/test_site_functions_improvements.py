@@ -3,11 +3,12 @@ Tests for improved site_functions.py functionality
 Tests the new consolidated and refactored functions
 """
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 from types import SimpleNamespace
 import sys
 import os
 import string
+import tempfile
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
@@ -17,6 +18,14 @@ from wo.cli.plugins.site_functions import (
     generate_random,
     generate_random_pass,
     generate_8_random,
+    parse_wp_db_config,
+    _configure_wp_variables,
+    build_wp_batch,
+    installwp_plugins,
+    activatewp_plugins,
+    update_wp_options,
+    db_copy_tables,
+    clone_database,
     PHPVersionManager,
     SiteError
 )
@@ -177,7 +186,8 @@ class TestGenerateRandomRefactored(unittest.TestCase):
         """Test requesting more characters than available in charset"""
         charset = "ABC"
         result = generate_random(10, charset)
-        self.assertEqual(len(result), 3)  # Should be limited to charset length
+        self.assertEqual(len(result), 10)  # Characters may repeat
+        self.assertTrue(all(c in charset for c in result))
 
     def test_generate_random_pass_compatibility(self):
         """Test backward compatibility wrapper for password generation"""
@@ -339,5 +349,243 @@ class TestRefactoringBenefits(unittest.TestCase):
                 self.assertEqual(result, expected)
 
 
+class TestParseWpDbConfig(unittest.TestCase):
+    """Test wp-config.php database credential parsing"""
+
+    def _write_config(self, content):
+        handle, path = tempfile.mkstemp(suffix='-config.php')
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_parse_single_quoted_defines(self):
+        """Test the standard wp-cli generated define() form"""
+        path = self._write_config(
+            "<?php\n"
+            "define( 'DB_NAME', 'example_db' );\n"
+            "define( 'DB_USER', 'example_user' );\n"
+            "define( 'DB_PASSWORD', 'secret' );\n"
+            "define( 'DB_HOST', 'localhost' );\n")
+        self.assertEqual(parse_wp_db_config(path), {
+            'DB_NAME': 'example_db',
+            'DB_USER': 'example_user',
+            'DB_PASSWORD': 'secret',
+            'DB_HOST': 'localhost',
+        })
+
+    def test_parse_double_quoted_and_spaced_defines(self):
+        """Test double quotes and extra whitespace are accepted"""
+        path = self._write_config(
+            '\ufeff<?php\n'
+            'define("DB_NAME","example_db");\n'
+            'define(  "DB_HOST" ,   "127.0.0.1"  );\n')
+        self.assertEqual(parse_wp_db_config(path),
+                         {'DB_NAME': 'example_db', 'DB_HOST': '127.0.0.1'})
+
+    def test_parse_value_containing_other_quote(self):
+        """Test a value may contain the quote character it is not wrapped in"""
+        path = self._write_config(
+            "<?php\n"
+            "define( 'DB_PASSWORD', 'ab\"cd' );\n"
+            'define( "DB_USER", "it\'s" );\n')
+        self.assertEqual(parse_wp_db_config(path),
+                         {'DB_PASSWORD': 'ab"cd', 'DB_USER': "it's"})
+
+    def test_parse_first_define_wins(self):
+        """Test a redefined constant keeps its first value, as in PHP"""
+        path = self._write_config(
+            "<?php\n"
+            "define( 'DB_NAME', 'example_db' );\n"
+            "define( 'DB_NAME', 'ignored_db' );\n")
+        self.assertEqual(parse_wp_db_config(path), {'DB_NAME': 'example_db'})
+
+    def test_parse_skips_commented_defines(self):
+        """Test a commented-out define above the real one is ignored"""
+        path = self._write_config(
+            "<?php\n"
+            "// define('DB_HOST', 'old');\n"
+            "# define('DB_NAME', 'old_db');\n"
+            "define('DB_HOST', 'localhost');\n"
+            "define('DB_NAME', 'example_db');\n")
+        self.assertEqual(parse_wp_db_config(path),
+                         {'DB_HOST': 'localhost', 'DB_NAME': 'example_db'})
+
+    def test_parse_empty_file(self):
+        """Test an empty config file returns an empty dict"""
+        path = self._write_config('')
+        self.assertEqual(parse_wp_db_config(path), {})
+
+    def test_parse_missing_file(self):
+        """Test a missing file returns an empty dict"""
+        self.assertEqual(parse_wp_db_config('/nonexistent/wp-config.php'), {})
+
+
+class TestConfigureWpVariables(unittest.TestCase):
+    """Test wp-config.php constants are set by a single wp-cli run"""
+
+    @patch('wo.cli.plugins.site_functions.Log')
+    @patch('wo.cli.plugins.site_functions.WOShellExec.cmd_exec',
+           return_value=True)
+    def test_single_eval_file_call(self, mock_exec, mock_log):
+        _configure_wp_variables(Mock(), "it's.example.com")
+
+        mock_exec.assert_called_once()
+        args = mock_exec.call_args[0][1]
+        self.assertEqual(args[-3:], ['eval-file', '-', '--skip-wordpress'])
+        script = mock_exec.call_args[1]['input_data']
+        self.assertIn("'WP_REDIS_PREFIX', 'it\\'s.example.com:'], []);",
+                      script)
+        self.assertIn("'MEDIA_TRASH', 'true'], ['raw' => true]);", script)
+        mock_log.error.assert_not_called()
+
+    @patch('wo.cli.plugins.site_functions.Log')
+    @patch('wo.cli.plugins.site_functions.WOShellExec.cmd_exec',
+           return_value=False)
+    def test_failure_is_reported(self, mock_exec, mock_log):
+        _configure_wp_variables(Mock(), 'example.com')
+        mock_log.error.assert_called_once()
+
+
+class TestWpBatch(unittest.TestCase):
+    """Test several wp-cli commands are replayed from one eval-file run"""
+
+    def test_build_wp_batch(self):
+        args, script = build_wp_batch(
+            [(['option', 'update', 'blogname', "Bob's"], ()),
+             (['config', 'set', 'WP_CACHE', 'true'], ('raw',))],
+            skip_wordpress=True)
+        self.assertEqual(args[-3:], ['eval-file', '-', '--skip-wordpress'])
+        self.assertEqual(script.splitlines(), [
+            "<?php",
+            "WP_CLI::run_command(['option', 'update', 'blogname', 'Bob\\'s'], []);",
+            "WP_CLI::run_command(['config', 'set', 'WP_CACHE', 'true'], ['raw' => true]);",
+        ])
+
+    @patch('wo.cli.plugins.site_functions.Log')
+    @patch('wo.cli.plugins.site_functions.WOFileUtils')
+    @patch('wo.cli.plugins.site_functions.WOShellExec.cmd_exec',
+           return_value=True)
+    def test_update_wp_options_single_run(self, mock_exec, mock_fileutils,
+                                          mock_log):
+        update_wp_options(Mock(), {'blogname': 'Site', 'flag': True,
+                                   'data': {'a': 1}},
+                          {'webroot': '/var/www/example.com'})
+        mock_exec.assert_called_once()
+        script = mock_exec.call_args[1]['input_data']
+        self.assertIn("'option', 'update', 'flag', '1'", script)
+        self.assertIn("'option', 'update', 'data', '{\"a\": 1}'", script)
+
+    @patch('wo.cli.plugins.site_functions.Log')
+    @patch('wo.cli.plugins.site_functions.WOShellExec.cmd_exec',
+           return_value=True)
+    def test_update_wp_options_with_plugin_options(self, mock_exec, mock_log):
+        update_wp_options(Mock(), {'blogname': 'Site'},
+                          {'webroot': '/var/www/example.com', 'multisite': True},
+                          plugin_options={'nginx-helper': {'rt_wp_nginx_helper_options': 'x'}})
+        mock_exec.assert_called_once()
+        script = mock_exec.call_args[1]['input_data'].splitlines()
+        self.assertIn("'network', 'meta', 'update', '1', 'rt_wp_nginx_helper_options'", script[1])
+        self.assertIn("'option', 'update', 'blogname', 'Site'", script[2])
+
+    @patch('wo.cli.plugins.site_functions.Log')
+    @patch('wo.cli.plugins.site_functions.WOShellExec.cmd_exec',
+           return_value=True)
+    def test_installwp_plugins_single_run(self, mock_exec, mock_log):
+        installwp_plugins(Mock(), ['nginx-helper', 'redis-cache'],
+                          {'webroot': '/var/www/example.com'})
+        mock_exec.assert_called_once()
+        cmd = mock_exec.call_args[0][1]
+        self.assertIn("plugin install nginx-helper redis-cache", cmd)
+        self.assertNotIn("--activate", cmd)
+
+    @patch('wo.cli.plugins.site_functions.Log')
+    @patch('wo.cli.plugins.site_functions.WOShellExec.cmd_exec',
+           return_value=True)
+    def test_activatewp_plugins_single_run(self, mock_exec, mock_log):
+        activatewp_plugins(Mock(), ['nginx-helper', 'redis-cache'],
+                           {'webroot': '/var/www/example.com'})
+        mock_exec.assert_called_once()
+        cmd = mock_exec.call_args[0][1]
+        self.assertIn("plugin activate nginx-helper redis-cache", cmd)
+        self.assertNotIn("--network", cmd)
+
+
+class TestDbCopyTables(unittest.TestCase):
+    """Test the server-side database copy used by same-host clones"""
+
+    def _connection(self, tables, trigger=None):
+        connection = MagicMock()
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = tables
+        cursor.fetchone.return_value = trigger
+        return connection, cursor
+
+    @patch('wo.cli.plugins.site_functions.WOMysql.connect')
+    def test_copies_tables_without_locking_source(self, mock_connect):
+        connection, cursor = self._connection(
+            [('wp_posts', 'BASE TABLE'), ('wp_postmeta', 'BASE TABLE')])
+        mock_connect.return_value = connection
+
+        self.assertTrue(db_copy_tables(Mock(), 'src_db', 'dest_db'))
+
+        statements = [c[0][0] for c in cursor.execute.call_args_list]
+        self.assertIn("CREATE TABLE `dest_db`.`wp_posts` LIKE `src_db`.`wp_posts`",
+                      statements)
+        isolation = statements.index(
+            "SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED")
+        inserts = [i for i, sql in enumerate(statements) if sql.startswith("INSERT")]
+        self.assertEqual(len(inserts), 2)
+        self.assertTrue(all(i > isolation for i in inserts))
+        self.assertTrue(all(sql.startswith("CREATE") for sql in statements
+                            if "LIKE `src_db`" in sql))
+        self.assertNotIn("REPEATABLE READ", " ".join(statements))
+        connection.commit.assert_called_once()
+        connection.close.assert_called_once()
+
+    @patch('wo.cli.plugins.site_functions.WOMysql.connect')
+    def test_views_or_triggers_are_left_to_dump(self, mock_connect):
+        for tables, trigger in (([('v', 'VIEW')], None),
+                                ([('wp_posts', 'BASE TABLE')], (1,))):
+            with self.subTest(tables=tables, trigger=trigger):
+                connection, cursor = self._connection(tables, trigger)
+                mock_connect.return_value = connection
+                self.assertFalse(db_copy_tables(Mock(), 'src_db', 'dest_db'))
+                statements = [c[0][0] for c in cursor.execute.call_args_list]
+                self.assertFalse(any(sql.startswith(("CREATE", "INSERT"))
+                                     for sql in statements))
+                connection.commit.assert_not_called()
+
+    @patch('wo.cli.plugins.site_functions.Log')
+    @patch('wo.cli.plugins.site_functions.WOShellExec.cmd_exec_pipe',
+           return_value=True)
+    @patch('wo.cli.plugins.site_functions.db_copy_tables')
+    def test_clone_database_falls_back_to_dump(self, mock_copy, mock_pipe, mock_log):
+        src = {'DB_NAME': 'src_db', 'DB_HOST': 'localhost'}
+        dest = {'DB_NAME': 'dest_db', 'DB_HOST': 'localhost'}
+        for outcome in (False, Exception('boom')):
+            with self.subTest(outcome=outcome):
+                mock_pipe.reset_mock()
+                if isinstance(outcome, Exception):
+                    mock_copy.side_effect = outcome
+                else:
+                    mock_copy.side_effect = None
+                    mock_copy.return_value = outcome
+                clone_database(Mock(), 'src.com', src, dest)
+                mock_pipe.assert_called_once()
+
+        mock_copy.reset_mock()
+        mock_pipe.reset_mock()
+        mock_copy.side_effect = None
+        mock_copy.return_value = True
+        clone_database(Mock(), 'src.com', src, dest)
+        mock_pipe.assert_not_called()
+
+        mock_copy.reset_mock()
+        clone_database(Mock(), 'src.com', dict(src, DB_HOST='db.example'), dest)
+        mock_copy.assert_not_called()
+        mock_pipe.assert_called_once()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
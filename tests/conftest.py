@@ -1,6 +1,8 @@
 import sys
 from types import ModuleType
 
+import pytest
+
 # Minimal nose stub
 nose = ModuleType('nose')
 class SkipTest(Exception):
@@ -64,3 +66,39 @@ apt.cache = apt_cache
 
 sys.modules.setdefault('apt', apt)
 sys.modules.setdefault('apt.cache', apt_cache)
+
+
+# Minimal controller for wo.core helpers that only log through app.log
+class _DummyLog:
+    def __init__(self):
+        self.messages = []
+
+    def debug(self, msg, *args, **kwargs):
+        self.messages.append(msg)
+
+    def error(self, *args, **kwargs):
+        raise AssertionError(args)
+
+    def info(self, *args, **kwargs):
+        pass
+
+    def warning(self, *args, **kwargs):
+        pass
+
+
+class _DummyApp:
+    def __init__(self):
+        self.log = _DummyLog()
+
+    def close(self, *args):
+        pass
+
+
+class _DummyController:
+    def __init__(self):
+        self.app = _DummyApp()
+
+
+@pytest.fixture
+def controller():
+    return _DummyController()
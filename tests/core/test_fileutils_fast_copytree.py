@@ -0,0 +1,31 @@
+import os
+
+from wo.core.fileutils import WOFileUtils
+
+
+def test_fast_copytree_copies_tree(controller, tmp_path):
+    src = tmp_path / "src"
+    dest = tmp_path / "dest"
+    (src / "wp-content" / "uploads").mkdir(parents=True)
+    (src / "index.php").write_text("hello")
+    (src / "wp-content" / "uploads" / "image.bin").write_bytes(os.urandom(3 * 1024 * 1024))
+    (src / "empty.txt").write_text("")
+    os.chmod(src / "index.php", 0o640)
+    WOFileUtils.fast_copytree(controller, str(src), str(dest))
+    assert (dest / "index.php").read_text() == "hello"
+    assert (dest / "empty.txt").read_text() == ""
+    assert ((dest / "wp-content" / "uploads" / "image.bin").read_bytes() ==
+            (src / "wp-content" / "uploads" / "image.bin").read_bytes())
+    assert os.stat(dest / "index.php").st_mode & 0o777 == 0o640
+
+
+def test_fast_copytree_skips_special_files(controller, tmp_path):
+    src = tmp_path / "src"
+    dest = tmp_path / "dest"
+    src.mkdir()
+    os.mkfifo(src / "pipe")
+    os.symlink(str(tmp_path / "missing"), src / "dangling")
+    WOFileUtils.fast_copytree(controller, str(src), str(dest))
+    assert os.listdir(dest) == []
+    skipped = [msg for msg in controller.app.log.messages if "Skipping" in msg]
+    assert len(skipped) == 2
@@ -0,0 +1,17 @@
+import os
+
+from wo.core.fileutils import WOFileUtils
+
+
+def test_create_symlink(controller, tmp_path):
+    src = tmp_path / "access.log"
+    dst = tmp_path / "logs-access.log"
+    WOFileUtils.create_symlink(controller, [str(src), str(dst)])
+    assert os.readlink(dst) == str(src)
+
+
+def test_create_symlink_existing_link_kept(controller, tmp_path):
+    dst = tmp_path / "link"
+    os.symlink(str(tmp_path / "old"), dst)
+    WOFileUtils.create_symlink(controller, [str(tmp_path / "new"), str(dst)])
+    assert os.readlink(dst) == str(tmp_path / "old")
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from wo.core.htpasswd import apr1_crypt, write_htpasswd
+
+
+def test_apr1_crypt_matches_openssl_vectors():
+    # expected values from `openssl passwd -apr1 -salt <salt> <password>`
+    assert apr1_crypt('secret', 'abcdefgh') == '$apr1$abcdefgh$h9FWgUz3n9YxylKLlR5SQ/'
+    assert apr1_crypt('', '12345678') == '$apr1$12345678$sHuPAw7VA9xjRbJz7zKV7/'
+    assert apr1_crypt('x' * 40, './AZaz09') == '$apr1$./AZaz09$OxGEBzLqsXTXgub3wz0Dq.'
+
+
+def test_apr1_crypt_random_salt():
+    first = apr1_crypt('secret')
+    assert first.startswith('$apr1$') and len(first.split('$')[2]) == 8
+    assert first != apr1_crypt('secret')
+
+
+def test_write_htpasswd(tmp_path):
+    cred = tmp_path / 'credentials'
+    write_htpasswd(str(cred), 'admin', 'secret')
+    user, hashed = cred.read_text().rstrip('\n').split(':', 1)
+    assert user == 'admin'
+    salt = hashed.split('$')[2]
+    assert hashed == apr1_crypt('secret', salt)
+    assert os.path.getsize(cred) == len(f'admin:{hashed}\n')
+
+
+def test_write_htpasswd_mode_and_symlink(tmp_path):
+    cred = tmp_path / 'credentials'
+    cred.write_text('old\n')
+    cred.chmod(0o644)
+    write_htpasswd(str(cred), 'admin', 'secret')
+    assert cred.stat().st_mode & 0o777 == 0o640
+
+    target = tmp_path / 'target'
+    target.write_text('keep\n')
+    link = tmp_path / 'link'
+    link.symlink_to(target)
+    with pytest.raises(OSError):
+        write_htpasswd(str(link), 'admin', 'secret')
+    assert target.read_text() == 'keep\n'
@@ -250,6 +250,15 @@ class WOSiteAutoUpdateController(CementBaseController):
             shutil.move(archive_path, new_path)
             Log.debug(self, f"Renamed backup: {filename} -> {new_filename}")
 
+            # Keep the checksum sidecar pointing at the renamed archive
+            checksum_path = f"{archive_path}.sha256"
+            if os.path.isfile(checksum_path):
+                with open(checksum_path, 'r', encoding='utf-8') as f:
+                    checksum = f.read().replace(filename, new_filename)
+                with open(f"{new_path}.sha256", 'w', encoding='utf-8') as f:
+                    f.write(checksum)
+                os.remove(checksum_path)
+
             return new_path
 
         except Exception as e:
@@ -3,9 +3,14 @@ import os
 import glob
 from datetime import datetime
 
+try:
+    import readline  # noqa: F401 - line editing for input() prompts
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    readline = None
+
 from cement.core.controller import CementBaseController, expose
 
-from wo.cli.plugins.site_functions import SiteError, check_domain_exists
+from wo.cli.plugins.site_functions import SiteError
 from wo.cli.plugins.sitedb import getSiteInfo, getAllsites
 from wo.core.backup import WOBackup
 from wo.core.domainvalidate import WODomain
@@ -32,11 +37,12 @@ class WOSiteBackupController(CementBaseController):
              dict(help='backup all sites', action='store_true')),
         ]
 
-    def _backup_site(self, site, backup_root=None, backup_db=True, backup_files=True):
+    def _backup_site(self, site, siteinfo=None, backup_root=None, backup_db=True, backup_files=True):
         """Backup a single site using the centralized backup service.
 
         Args:
             site: Site name to backup
+            siteinfo: Optional pre-fetched site row, skips the getSiteInfo query
             backup_root: Optional custom backup directory
             backup_db: Whether to backup database
             backup_files: Whether to backup files
@@ -45,7 +51,8 @@ class WOSiteBackupController(CementBaseController):
             bool: True if backup was successful, False otherwise
         """
         # Get site information
-        siteinfo = getSiteInfo(self, site)
+        if siteinfo is None:
+            siteinfo = getSiteInfo(self, site)
         if not siteinfo:
             raise SiteError(f"Site {site} does not exist")
 
@@ -106,6 +113,7 @@ class WOSiteBackupController(CementBaseController):
                 try:
                     if self._backup_site(
                         site.sitename,
+                        siteinfo=site,
                         backup_root=pargs.path,
                         backup_db=backup_db,
                         backup_files=backup_files,
@@ -122,20 +130,25 @@ class WOSiteBackupController(CementBaseController):
 
         if not pargs.site_name:
             try:
-                while not pargs.site_name:
-                    pargs.site_name = input('Enter site name : ').strip()
-            except IOError as e:
+                pargs.site_name = input('Enter site name : ')
+            except (EOFError, IOError) as e:
                 Log.debug(self, str(e))
                 Log.error(self, 'Unable to input site name, Please try again!')
+                return
 
         pargs.site_name = pargs.site_name.strip()
+        if not pargs.site_name:
+            Log.error(self, 'site name cannot be empty')
+            return
         wo_domain = WODomain.validate(self, pargs.site_name)
-        if not check_domain_exists(self, wo_domain):
+        siteinfo = getSiteInfo(self, wo_domain)
+        if not siteinfo:
             Log.error(self, f"site {wo_domain} does not exist")
 
         try:
             success = self._backup_site(
                 wo_domain,
+                siteinfo=siteinfo,
                 backup_root=pargs.path,
                 backup_db=backup_db,
                 backup_files=backup_files,
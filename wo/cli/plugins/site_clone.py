@@ -1,4 +1,6 @@
 import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from getpass import getpass
 
 from cement.core.controller import CementBaseController, expose
@@ -8,7 +10,8 @@ from wo.cli.plugins.site_functions import (
     parse_wp_db_config, copy_nginx_acl_files,
     build_clone_site_data, clone_database, clone_website_files, update_wordpress_urls,
     generate_wp_config_for_clone)
-from wo.cli.plugins.sitedb import addNewSite, updateSiteInfo, getSiteInfo
+from wo.cli.plugins.sitedb import addNewSite, getSiteInfo
+from wo.core.acme import WOAcme
 from wo.core.domainvalidate import WODomain
 from wo.core.logging import Log
 from wo.core.nginxhashbucket import hashbucket
@@ -67,35 +70,55 @@ class WOSiteCloneController(CementBaseController):
         """Setup the destination site infrastructure."""
         # Setup domain and database infrastructure
         pre_run_checks(self)
-        setupdomain(self, data)
-        hashbucket(self)
-
-        # Add site to database
-        addNewSite(self, dest, src_info.site_type,
-                   src_info.cache_type if src_info.cache_type else 'basic',
-                   data['webroot'], php_version=src_info.php_version)
+        # The nginx reload at the end of the clone tests the new vhost
+        setupdomain(self, data, validate=False)
+        hashbucket(self, dest)
 
         # Setup database
         data = setupdatabase(self, data)
 
-        # Update site information
-        updateSiteInfo(self, dest, db_name=data['wo_db_name'],
-                       db_user=data['wo_db_user'], db_password=data['wo_db_pass'],
-                       db_host=data['wo_db_host'], php_version=src_info.php_version,
-                       stype=src_info.site_type,
-                       cache=src_info.cache_type if src_info.cache_type else 'basic')
+        # Add site to database with its credentials in a single commit
+        addNewSite(self, dest, src_info.site_type,
+                   src_info.cache_type if src_info.cache_type else 'basic',
+                   data['webroot'], db_name=data['wo_db_name'],
+                   db_user=data['wo_db_user'], db_password=data['wo_db_pass'],
+                   db_host=data['wo_db_host'], php_version=src_info.php_version)
 
         # Setup PHP-FPM
         setup_php_fpm(self, data)
 
         return data
 
+    def _queue_letsencrypt(self, dest, webroot):
+        """Issue the destination certificate in a detached background process."""
+        # An existing certificate makes `wo site update` prompt for what to
+        # do with it, which a detached process cannot answer
+        if WOAcme.cert_check(self, dest):
+            setup_letsencrypt(self, dest, webroot)
+            return
+
+        # --force: like setup_letsencrypt, do not abort on the DNS check
+        log_path = f"/var/log/wo/letsencrypt-{dest}.log"
+        try:
+            with open(log_path, 'ab') as log_file:
+                subprocess.Popen(['wo', 'site', 'update', dest,
+                                  '--letsencrypt=on', '--force'],
+                                 stdin=subprocess.DEVNULL, stdout=log_file,
+                                 stderr=subprocess.STDOUT, start_new_session=True)
+        except OSError as e:
+            Log.debug(self, f"Unable to queue SSL setup: {e}")
+            setup_letsencrypt(self, dest, webroot)
+            return
+        Log.info(self, f"SSL issuance for {dest} queued in background, "
+                       f"check `tail {log_path}` for the result")
+
     @expose(hide=True)
     def default(self):
         """
         Main entry point for site cloning - refactored for orchestration-only logic.
         """
         pargs = self.app.pargs
+        webroot_base = WOVar.wo_webroot
 
         # 1. Get and validate site names
         src, dest = self._get_site_names(pargs)
@@ -125,13 +148,8 @@ class WOSiteCloneController(CementBaseController):
         # 5. Setup destination site infrastructure
         data = self._setup_destination_site(src_info, data, dest)
 
-        # 6. Copy nginx ACL files
-        src_slug = src.replace('.', '-').lower()
-        dest_slug = dest.replace('.', '-').lower()
-        copy_nginx_acl_files(self, src_slug, dest_slug)
-
-        # 7. Parse source database configuration
-        conf_src = os.path.join(WOVar.wo_webroot, src, 'wp-config.php')
+        # 6. Parse source database configuration
+        conf_src = os.path.join(webroot_base, src, 'wp-config.php')
         src_db_config = parse_wp_db_config(conf_src)
         dest_db_config = {
             'DB_NAME': data['wo_db_name'],
@@ -140,20 +158,28 @@ class WOSiteCloneController(CementBaseController):
             'DB_HOST': data['wo_db_host'],
         }
 
-        # 8. Clone database
-        clone_database(self, src, src_db_config, dest_db_config)
-
-        # 9. Clone website files from source to destination
-        clone_website_files(self, src, dest)
+        # 7-9. Clone the database in the background while the nginx ACL and
+        # website files are copied; the dump/import runs in mariadb child
+        # processes, so the thread only waits on them
+        # the destination slug is the PHP-FPM pool name computed above
+        src_slug = src.replace('.', '-').lower()
+        dest_slug = data['pool_name']
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            db_clone = executor.submit(clone_database, self, src,
+                                       src_db_config, dest_db_config)
+            copy_nginx_acl_files(self, src_slug, dest_slug)
+            clone_website_files(self, src, dest)
+            db_clone.result()
 
         # 10. Generate ONLY wp-config.php for cloned site (preserves all cloned files)
         generate_wp_config_for_clone(self, data)
 
         # 11. Update WordPress URLs in database
-        update_wordpress_urls(self, src, dest, data['webroot'])
+        update_wordpress_urls(self, src, dest, data['webroot'],
+                              multisite=data['multisite'], db_name=data['wo_db_name'])
 
         # 12. Set proper permissions
-        conf_dest = os.path.join(WOVar.wo_webroot, dest, 'wp-config.php')
+        conf_dest = os.path.join(data['webroot'], 'wp-config.php')
         dest_htdocs = os.path.join(data['webroot'], 'htdocs')
         setwebrootpermissions(self, dest_htdocs, data['php_fpm_user'])
         WOFileUtils.chown(self, conf_dest, data['php_fpm_user'], data['php_fpm_user'])
@@ -161,9 +187,10 @@ class WOSiteCloneController(CementBaseController):
         # 13. Reload nginx
         WOService.reload_service(self, 'nginx')
 
-        # 14. Setup SSL if source has SSL
+        # 14. Setup SSL if source has SSL; issuance waits on ACME challenges,
+        # so hand it to a detached `wo site update` and return right away
         if src_info.is_ssl:
-            setup_letsencrypt(self, dest, data['webroot'])
+            self._queue_letsencrypt(dest, data['webroot'])
 
         # 15. Success message
         Log.info(self, f"Successfully cloned '{src}' → '{dest}'")
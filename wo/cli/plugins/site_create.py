@@ -1,3 +1,4 @@
+import contextlib
 import os
 
 from cement.core.controller import CementBaseController, expose
@@ -14,15 +15,236 @@ from wo.cli.plugins.sitedb import (addNewSite, deleteSiteInfo,
 from wo.core.acme import WOAcme
 from wo.core.domainvalidate import WODomain
 from wo.core.git import WOGit
+from wo.core.htpasswd import write_htpasswd
 from wo.core.logging import Log
 from wo.core.nginxhashbucket import hashbucket
 from wo.core.services import WOService
 from wo.core.sslutils import SSL
 from wo.core.template import WOTemplate
 from wo.core.random import RANDOM
-from wo.core.shellexec import WOShellExec
 from wo.core.variables import WOVar
 
+# PHP version flags (php74, ...) in declaration order, and version -> flag
+_PHP_KEYS = tuple(WOVar.wo_php_versions)
+_PHP_FALSE_MAP = dict.fromkeys(_PHP_KEYS, False)
+_PHP_VER_TO_KEY = {ver: key for key, ver in WOVar.wo_php_versions.items()}
+
+# Domain -> slug used for the php-fpm pool name and ACL directory
+_DOT_TO_DASH = str.maketrans('.', '-')
+
+# Site type and cache flags every new site starts from
+_DEFAULT_SITE_DATA = {
+    'static': False, 'basic': False, 'wp': False, 'wpfc': False,
+    'wpsc': False, 'wpredis': False, 'wprocket': False, 'wpce': False,
+    'multisite': False, 'wpsubdir': False,
+}
+
+# Controller arguments, built once at import; PHP version flags are
+# appended from WOVar.wo_php_versions. cement's controller_validator
+# requires a list
+_ARGUMENTS = [
+    (['site_name'],
+        dict(help='domain name for the site to be created.',
+             nargs='?')),
+    (['--html'],
+        dict(help="create html site", action='store_true')),
+    (['--php'],
+     dict(help="create php site", action='store_true')),
+    (['--mysql'],
+        dict(help="create mysql site", action='store_true')),
+    (['--wp'],
+        dict(help="create WordPress single site",
+             action='store_true')),
+    (['--wpsubdir'],
+        dict(help="create WordPress multisite with subdirectory setup",
+             action='store_true')),
+    (['--wpsubdomain'],
+        dict(help="create WordPress multisite with subdomain setup",
+             action='store_true')),
+    (['--wpfc'],
+        dict(help="create WordPress single/multi site with "
+             "Nginx fastcgi_cache",
+             action='store_true')),
+    (['--wpsc'],
+        dict(help="create WordPress single/multi site with wpsc cache",
+             action='store_true')),
+    (['--wprocket'],
+     dict(help="create WordPress single/multi site with WP-Rocket",
+          action='store_true')),
+    (['--wpce'],
+     dict(help="create WordPress single/multi site with Cache-Enabler",
+          action='store_true')),
+    (['--wpredis'],
+        dict(help="create WordPress single/multi site "
+             "with redis cache",
+             action='store_true')),
+    (['--alias'],
+        dict(help="domain name to redirect to",
+             action='store', nargs='?')),
+    (['--subsiteof'],
+        dict(help="create a subsite of a multisite install",
+             action='store', nargs='?')),
+    (['-le', '--letsencrypt'],
+        dict(help="configure letsencrypt ssl for the site",
+             action='store',
+             choices=('on', 'subdomain', 'wildcard'),
+             const='on', nargs='?')),
+    (['--force'],
+        dict(help="force Let's Encrypt certificate issuance",
+             action='store_true')),
+    (['--dns'],
+        dict(help="choose dns provider api for letsencrypt",
+             action='store',
+             const='dns_cf', nargs='?')),
+    (['--dnsalias'],
+        dict(help="set domain used for acme dns alias validation",
+             action='store', nargs='?')),
+    (['--hsts'],
+        dict(help="enable HSTS for site secured with letsencrypt",
+             action='store_true')),
+    (['--ngxblocker'],
+        dict(help="enable ngxblocker for the site",
+             action='store_true')),
+    (['--user'],
+        dict(help="provide user for WordPress site")),
+    (['--email'],
+        dict(help="provide email address for WordPress site")),
+    (['--pass'],
+        dict(help="provide password for WordPress user",
+             dest='wppass')),
+    (['--proxy'],
+        dict(help="create proxy for site", nargs='+')),
+    (['--vhostonly'], dict(help="only create vhost and database "
+                           "without installing WordPress",
+                           action='store_true')),
+    (['--template'],
+        dict(help="path to WordPress provisioning template",
+             dest='template', metavar='FILE')),
+    (['--secure'],
+        dict(help="enable HTTP basic authentication", action='store_true')),
+] + [
+    ([f'--{php_version}'],
+        dict(help=f'Create PHP {php_number} site', action='store_true'))
+    for php_version, php_number in WOVar.wo_php_versions.items()
+]
+
+
+def _rollback_site(controller, wo_domain, data, reason=None):
+    """Remove everything created so far for a site that failed to set up."""
+    Log.info(controller, Log.FAIL +
+             "There was a serious error encountered...")
+    Log.info(controller, Log.FAIL + "Cleaning up afterwards...")
+    doCleanupAction(controller, domain=wo_domain, webroot=data['webroot'])
+    if 'wo_db_name' in data:
+        Log.debug(controller, "Running DB cleanup")
+        doCleanupAction(controller, domain=wo_domain,
+                        dbname=data['wo_db_name'],
+                        dbuser=data['wo_db_user'],
+                        dbhost=data['wo_mysql_grant_host'])
+    deleteSiteInfo(controller, wo_domain)
+    if reason:
+        Log.info(controller, Log.FAIL + reason)
+    Log.error(controller, "Check the log for details: "
+              "`tail /var/log/wo/wordops.log` and please try again")
+
+
+def _build_proxy_data(controller, pargs, site_data, cache, extra_info):
+    return {**site_data, 'static': True, 'basic': True, 'proxy': True,
+            'host': extra_info['host'], 'port': extra_info['port']}
+
+
+def _build_alias_data(controller, pargs, site_data, cache, extra_info):
+    return {**site_data, 'static': True, 'basic': True, 'alias': True,
+            'alias_name': extra_info['alias_name']}
+
+
+def _build_subsite_data(controller, pargs, site_data, cache, extra_info):
+    subsiteof_name = extra_info['subsiteof_name']
+    # Get parent site data
+    parent_site_info = getSiteInfo(controller, subsiteof_name)
+    if not parent_site_info:
+        Log.error(controller, f"Parent site {subsiteof_name} does not exist")
+    if not parent_site_info.is_enabled:
+        Log.error(controller, f"Parent site {subsiteof_name} is not enabled")
+    if parent_site_info.site_type not in ['wpsubdomain', 'wpsubdir']:
+        Log.error(controller, f"Parent site {subsiteof_name} "
+                  "is not WordPress multisite")
+
+    data = dict(site_data)
+    data["wp"] = parent_site_info.site_type == 'wp'
+    data["wpfc"] = parent_site_info.cache_type == 'wpfc'
+    data["wpsc"] = parent_site_info.cache_type == 'wpsc'
+    data["wprocket"] = parent_site_info.cache_type == 'wprocket'
+    data["wpce"] = parent_site_info.cache_type == 'wpce'
+    data["wpredis"] = parent_site_info.cache_type == 'wpredis'
+    data["wpsubdir"] = parent_site_info.site_type == 'wpsubdir'
+    data["wo_php"] = ("php" + parent_site_info.php_version).replace(".", "")
+    data['subsite'] = True
+    data['subsiteof_name'] = subsiteof_name
+    data['subsiteof_webroot'] = parent_site_info.site_path
+    return data
+
+
+def _build_html_data(controller, pargs, site_data, cache, extra_info):
+    return {**site_data, 'static': True}
+
+
+def _build_php_data(controller, pargs, site_data, cache, extra_info):
+    return {**site_data, 'basic': True}
+
+
+def _build_mysql_data(controller, pargs, site_data, cache, extra_info):
+    return {**site_data, 'basic': True, 'wo_db_name': '', 'wo_db_user': '',
+            'wo_db_pass': '', 'wo_db_host': ''}
+
+
+def _build_wp_data(controller, pargs, site_data, cache, extra_info):
+    data = _build_mysql_data(controller, pargs, site_data, cache, extra_info)
+    data.update({'wp': True, 'basic': False, cache: True,
+                 'wp-user': pargs.user, 'wp-email': pargs.email,
+                 'wp-pass': pargs.wppass})
+    return data
+
+
+def _build_wpsubdomain_data(controller, pargs, site_data, cache,
+                            extra_info):
+    data = _build_wp_data(controller, pargs, site_data, cache, extra_info)
+    data['multisite'] = True
+    return data
+
+
+def _build_wpsubdir_data(controller, pargs, site_data, cache, extra_info):
+    data = _build_wpsubdomain_data(controller, pargs, site_data, cache,
+                                   extra_info)
+    data['wpsubdir'] = True
+    return data
+
+
+# Site data builder per site type; a bare --phpXX flag (stype 'php84',
+# ...) creates a plain PHP site
+_DATA_BUILDERS = {
+    'proxy': _build_proxy_data,
+    'alias': _build_alias_data,
+    'subsite': _build_subsite_data,
+    'html': _build_html_data,
+    'php': _build_php_data,
+    'mysql': _build_mysql_data,
+    'wp': _build_wp_data,
+    'wpsubdir': _build_wpsubdir_data,
+    'wpsubdomain': _build_wpsubdomain_data,
+    **dict.fromkeys(PHPVersionManager.SUPPORTED_VERSIONS, _build_php_data),
+}
+
+
+@contextlib.contextmanager
+def _site_create_guard(controller, wo_domain, data):
+    """Roll the site back if the wrapped setup step raises SiteError."""
+    try:
+        yield
+    except SiteError as e:
+        Log.debug(controller, str(e))
+        _rollback_site(controller, wo_domain, data)
+
 
 class WOSiteCreateController(CementBaseController):
     class Meta:
@@ -31,91 +253,7 @@ class WOSiteCreateController(CementBaseController):
         stacked_type = 'nested'
         description = ('this commands set up configuration and installs '
                        'required files as options are provided')
-        arguments = [
-            (['site_name'],
-                dict(help='domain name for the site to be created.',
-                     nargs='?')),
-            (['--html'],
-                dict(help="create html site", action='store_true')),
-            (['--php'],
-             dict(help="create php site", action='store_true')),
-            (['--mysql'],
-                dict(help="create mysql site", action='store_true')),
-            (['--wp'],
-                dict(help="create WordPress single site",
-                     action='store_true')),
-            (['--wpsubdir'],
-                dict(help="create WordPress multisite with subdirectory setup",
-                     action='store_true')),
-            (['--wpsubdomain'],
-                dict(help="create WordPress multisite with subdomain setup",
-                     action='store_true')),
-            (['--wpfc'],
-                dict(help="create WordPress single/multi site with "
-                     "Nginx fastcgi_cache",
-                     action='store_true')),
-            (['--wpsc'],
-                dict(help="create WordPress single/multi site with wpsc cache",
-                     action='store_true')),
-            (['--wprocket'],
-             dict(help="create WordPress single/multi site with WP-Rocket",
-                  action='store_true')),
-            (['--wpce'],
-             dict(help="create WordPress single/multi site with Cache-Enabler",
-                  action='store_true')),
-            (['--wpredis'],
-                dict(help="create WordPress single/multi site "
-                     "with redis cache",
-                     action='store_true')),
-            (['--alias'],
-                dict(help="domain name to redirect to",
-                     action='store', nargs='?')),
-            (['--subsiteof'],
-                dict(help="create a subsite of a multisite install",
-                     action='store', nargs='?')),
-            (['-le', '--letsencrypt'],
-                dict(help="configure letsencrypt ssl for the site",
-                     action='store' or 'store_const',
-                     choices=('on', 'subdomain', 'wildcard'),
-                     const='on', nargs='?')),
-            (['--force'],
-                dict(help="force Let's Encrypt certificate issuance",
-                     action='store_true')),
-            (['--dns'],
-                dict(help="choose dns provider api for letsencrypt",
-                     action='store' or 'store_const',
-                     const='dns_cf', nargs='?')),
-            (['--dnsalias'],
-                dict(help="set domain used for acme dns alias validation",
-                     action='store', nargs='?')),
-            (['--hsts'],
-                dict(help="enable HSTS for site secured with letsencrypt",
-                     action='store_true')),
-            (['--ngxblocker'],
-                dict(help="enable HSTS for site secured with letsencrypt",
-                     action='store_true')),
-            (['--user'],
-                dict(help="provide user for WordPress site")),
-            (['--email'],
-                dict(help="provide email address for WordPress site")),
-            (['--pass'],
-                dict(help="provide password for WordPress user",
-                     dest='wppass')),
-            (['--proxy'],
-                dict(help="create proxy for site", nargs='+')),
-            (['--vhostonly'], dict(help="only create vhost and database "
-                                   "without installing WordPress",
-                                   action='store_true')),
-            (['--template'],
-                dict(help="path to WordPress provisioning template",
-                     dest='template', metavar='FILE')),
-            (['--secure'],
-                dict(help="enable HTTP basic authentication", action='store_true')),
-        ]
-        for php_version, php_number in WOVar.wo_php_versions.items():
-            arguments.append(([f'--{php_version}'],
-                              dict(help=f'Create PHP {php_number} site',
-                                   action='store_true')))
+        arguments = _ARGUMENTS
 
     def _get_site_name_input(self, pargs):
         """Get site name from user input if not provided"""
@@ -139,15 +277,40 @@ class WOSiteCreateController(CementBaseController):
 
         wo_site_webroot = WOVar.wo_webroot + wo_domain
 
-        # Check if domain already exists
+        # Check if domain already exists; lexists is a single lstat and
+        # also catches a dangling symlink left behind by a removed site
         if check_domain_exists(self, wo_domain):
             Log.error(self, f"site {wo_domain} already exists")
-        elif os.path.isfile(f'/etc/nginx/sites-available/{wo_domain}'):
+        elif os.path.lexists(f'/etc/nginx/sites-available/{wo_domain}'):
             Log.error(self, f"Nginx configuration /etc/nginx/sites-available/"
                       f"{wo_domain} already exists")
 
         return wo_domain, wo_www_domain, wo_domain_type, wo_root_domain, wo_site_webroot
 
+    def _finalize_simple_site(self, wo_domain, stype, cache, webroot, wo_auth):
+        """Register a proxy, alias or subsite and reload nginx.
+
+        Nothing else is provisioned for these site types, so a failed
+        reload removes the site again.
+        """
+        addNewSite(self, wo_domain, stype, cache, webroot)
+        # Service Nginx Reload
+        if not WOService.reload_service(self, 'nginx'):
+            Log.info(self, Log.FAIL +
+                     "There was a serious error encountered...")
+            Log.info(self, Log.FAIL + "Cleaning up afterwards...")
+            doCleanupAction(self, domain=wo_domain)
+            deleteSiteInfo(self, wo_domain)
+            Log.error(self, "service nginx reload failed. "
+                      "check issues with `nginx -t` command")
+            Log.error(self, "Check the log for details: "
+                      "`tail /var/log/wo/wordops.log` "
+                      "and please try again")
+        if wo_auth and len(wo_auth):
+            for msg in wo_auth:
+                Log.info(self, Log.ENDC + msg, log=False)
+        Log.info(self, f"Successfully created site http://{wo_domain}")
+
     @expose(hide=True)
     def default(self):
         pargs = self.app.pargs
@@ -159,12 +322,6 @@ class WOSiteCreateController(CementBaseController):
             Log.debug(self, str(e))
             Log.error(self, str(e))
 
-        # Extract additional info for different site types
-        host = extra_info.get('host')
-        port = extra_info.get('port')
-        alias_name = extra_info.get('alias_name')
-        subsiteof_name = extra_info.get('subsiteof_name')
-
         # Get site name from user if needed
         self._get_site_name_input(pargs)
 
@@ -172,117 +329,34 @@ class WOSiteCreateController(CementBaseController):
         wo_domain, wo_www_domain, wo_domain_type, wo_root_domain, wo_site_webroot = \
             self._validate_domain_and_setup(pargs)
 
-        if stype == 'proxy':
-            data = dict(
-                site_name=wo_domain, www_domain=wo_www_domain,
-                static=True, basic=True, wp=False,
-                wpfc=False, wpsc=False, wprocket=False, wpce=False,
-                multisite=False, wpsubdir=False, webroot=wo_site_webroot,
-                proxy=True, host=host, port=port)
-
-        if stype == 'alias':
-            data = dict(
-                site_name=wo_domain, www_domain=wo_www_domain,
-                static=True, basic=True, wp=False,
-                wpfc=False, wpsc=False, wprocket=False, wpce=False,
-                multisite=False, wpsubdir=False, webroot=wo_site_webroot,
-                alias=True, alias_name=alias_name)
-
-        if stype == 'subsite':
-            # Get parent site data
-            parent_site_info = getSiteInfo(self, subsiteof_name)
-            if not parent_site_info:
-                Log.error(self, "Parent site {0} does not exist"
-                          .format(subsiteof_name))
-            if not parent_site_info.is_enabled:
-                Log.error(self, "Parent site {0} is not enabled"
-                          .format(subsiteof_name))
-            if parent_site_info.site_type not in ['wpsubdomain', 'wpsubdir']:
-                Log.error(self, "Parent site {0} is not WordPress multisite"
-                          .format(subsiteof_name))
-
-            data = dict(
-                site_name=wo_domain, www_domain=wo_www_domain,
-                static=False, basic=False, multisite=False, webroot=wo_site_webroot)
-
-            data["wp"] = parent_site_info.site_type == 'wp'
-            data["wpfc"] = parent_site_info.cache_type == 'wpfc'
-            data["wpsc"] = parent_site_info.cache_type == 'wpsc'
-            data["wprocket"] = parent_site_info.cache_type == 'wprocket'
-            data["wpce"] = parent_site_info.cache_type == 'wpce'
-            data["wpredis"] = parent_site_info.cache_type == 'wpredis'
-            data["wpsubdir"] = parent_site_info.site_type == 'wpsubdir'
-            data["wo_php"] = ("php" + parent_site_info.php_version).replace(".", "")
-            data['subsite'] = True
-            data['subsiteof_name'] = subsiteof_name
-            data['subsiteof_webroot'] = parent_site_info.site_path
-
-        # Use centralized PHP version management instead of hardcoded checks
-        if PHPVersionManager.has_any_php_version(pargs):
-            data = dict(
-                site_name=wo_domain, www_domain=wo_www_domain,
-                static=False, basic=False,
-                wp=False, wpfc=False, wpsc=False, wprocket=False,
-                wpce=False, multisite=False,
-                wpsubdir=False, webroot=wo_site_webroot)
-            data['basic'] = True
+        # Every branch starts from the same all-False flags for this domain
+        site_data = {**_DEFAULT_SITE_DATA, 'site_name': wo_domain,
+                     'www_domain': wo_www_domain, 'webroot': wo_site_webroot}
 
-        if stype in ['html', 'php']:
-            data = dict(
-                site_name=wo_domain, www_domain=wo_www_domain,
-                static=True, basic=False, wp=False,
-                wpfc=False, wpsc=False, wprocket=False, wpce=False,
-                multisite=False, wpsubdir=False, webroot=wo_site_webroot)
-
-            if stype == 'php':
-                data['static'] = False
-                data['basic'] = True
-
-        elif stype in ['mysql', 'wp', 'wpsubdir', 'wpsubdomain']:
-
-            data = dict(
-                site_name=wo_domain, www_domain=wo_www_domain,
-                static=False, basic=True, wp=False, wpfc=False,
-                wpsc=False, wpredis=False, wprocket=False, wpce=False,
-                multisite=False, wpsubdir=False, webroot=wo_site_webroot,
-                wo_db_name='', wo_db_user='', wo_db_pass='',
-                wo_db_host='')
-
-            if stype in ['wp', 'wpsubdir', 'wpsubdomain']:
-                data['wp'] = True
-                data['basic'] = False
-                data[cache] = True
-                data['wp-user'] = pargs.user
-                data['wp-email'] = pargs.email
-                data['wp-pass'] = pargs.wppass
-                if stype in ['wpsubdir', 'wpsubdomain']:
-                    data['multisite'] = True
-                    if stype == 'wpsubdir':
-                        data['wpsubdir'] = True
-        else:
-            pass
+        builder = _DATA_BUILDERS.get(stype)
+        if builder is None:
+            Log.error(self, "Please provide valid options to creating site")
+        data = builder(self, pargs, site_data, cache, extra_info)
 
         # Initialize all PHP versions to False
-        for version in WOVar.wo_php_versions:
-            data[version] = False
+        data.update(_PHP_FALSE_MAP)
 
         # Check for PHP versions in pargs
-        for pargs_version, version in WOVar.wo_php_versions.items():
+        php_version = None
+        for pargs_version in _PHP_KEYS:
             if data and getattr(pargs, pargs_version, False):
                 data[pargs_version] = True
                 data['wo_php'] = pargs_version
-                php_version = version
+                php_version = WOVar.wo_php_versions[pargs_version]
                 break
         else:
             if self.app.config.has_section('php'):
                 config_php_ver = self.app.config.get('php', 'version')
-
-                for wo_key, php_ver in WOVar.wo_php_versions.items():
-                    if php_ver == config_php_ver:
-                        data[wo_key] = True
-                        data['wo_php'] = wo_key
-                        php_version = php_ver
-                        break
+                wo_key = _PHP_VER_TO_KEY.get(config_php_ver)
+                if wo_key:
+                    data[wo_key] = True
+                    data['wo_php'] = wo_key
+                    php_version = config_php_ver
 
         if ((not pargs.wpfc) and (not pargs.wpsc) and
             (not pargs.wprocket) and
@@ -306,11 +380,16 @@ class WOSiteCreateController(CementBaseController):
                 Log.debug(self, str(e))
                 Log.error(self, str(e))
 
-        # Define php-fpm variables for templates
-        data['pool_name'] = wo_domain.replace('.', '-').lower()
-        if 'wo_php' in data:
-            data['php_ver'] = data['wo_php'].replace('php', '')
-            data['php_fpm_user'] = f"php-{data['pool_name']}"
+        # Define php-fpm variables for templates; the slug is computed once
+        # and passed on, wo_php keys always start with 'php'
+        slug = wo_domain.translate(_DOT_TO_DASH).lower()
+        data['pool_name'] = slug
+        php_key = data.get('wo_php')
+        if php_key:
+            data['php_ver'] = php_key[3:]
+            data['php_fpm_user'] = f"php-{slug}"
+        # Sites without a dedicated pool keep the webroot owned by www-data
+        data.setdefault('php_fpm_user', WOVar.wo_php_user)
 
         # Check rerequired packages are installed or not
         wo_auth = site_package_check(self, stype)
@@ -323,85 +402,31 @@ class WOSiteCreateController(CementBaseController):
 
         try:
             try:
-                # setup NGINX configuration, and webroot
-                setupdomain(self, data)
-
-                # Fix Nginx Hashbucket size error
-                hashbucket(self)
-                self._render_protected(data, pargs.secure)
+                # setup NGINX configuration, and webroot; the vhost is
+                # only enabled afterwards, so `nginx -t` here would just
+                # repeat pre_run_checks; the nginx reload tests it instead
+                setupdomain(self, data, validate=False)
+
+                # The vhost includes the ACL protected.conf, so render it
+                # before any `nginx -t`; then fix the hash bucket size,
+                # skipping the nginx -t probe when the name already fits
+                self._render_protected(data, pargs.secure, slug=slug)
+                hashbucket(self, wo_domain)
             except SiteError as e:
                 # call cleanup actions on failure
                 Log.debug(self, str(e))
                 handle_site_error_cleanup(self, wo_domain, data['webroot'])
 
-            if 'proxy' in data.keys() and data['proxy']:
-                addNewSite(self, wo_domain, stype, cache, wo_site_webroot)
-                # Service Nginx Reload
-                if not WOService.reload_service(self, 'nginx'):
-                    Log.info(self, Log.FAIL +
-                             "There was a serious error encountered...")
-                    Log.info(self, Log.FAIL + "Cleaning up afterwards...")
-                    doCleanupAction(self, domain=wo_domain)
-                    deleteSiteInfo(self, wo_domain)
-                    Log.error(self, "service nginx reload failed. "
-                              "check issues with `nginx -t` command")
-                    Log.error(self, "Check the log for details: "
-                              "`tail /var/log/wo/wordops.log` "
-                              "and please try again")
-                if wo_auth and len(wo_auth):
-                    for msg in wo_auth:
-                        Log.info(self, Log.ENDC + msg, log=False)
-                Log.info(self, "Successfully created site"
-                         " http://{0}".format(wo_domain))
-
-            elif 'alias' in data.keys() and data['alias']:
-                addNewSite(self, wo_domain, stype, cache, wo_site_webroot)
-                # Service Nginx Reload
-                if not WOService.reload_service(self, 'nginx'):
-                    Log.info(self, Log.FAIL +
-                             "There was a serious error encountered...")
-                    Log.info(self, Log.FAIL + "Cleaning up afterwards...")
-                    doCleanupAction(self, domain=wo_domain)
-                    deleteSiteInfo(self, wo_domain)
-                    Log.error(self, "service nginx reload failed. "
-                              "check issues with `nginx -t` command")
-                    Log.error(self, "Check the log for details: "
-                              "`tail /var/log/wo/wordops.log` "
-                              "and please try again")
-                if wo_auth and len(wo_auth):
-                    for msg in wo_auth:
-                        Log.info(self, Log.ENDC + msg, log=False)
-                Log.info(self, "Successfully created site"
-                         " http://{0}".format(wo_domain))
-
-            elif 'subsite' in data.keys() and data['subsite']:
-                addNewSite(self, wo_domain, stype, cache, wo_site_webroot)
-                # Service Nginx Reload
-                if not WOService.reload_service(self, 'nginx'):
-                    Log.info(self, Log.FAIL +
-                             "There was a serious error encountered...")
-                    Log.info(self, Log.FAIL + "Cleaning up afterwards...")
-                    doCleanupAction(self, domain=wo_domain)
-                    deleteSiteInfo(self, wo_domain)
-                    Log.error(self, "service nginx reload failed. "
-                              "check issues with `nginx -t` command")
-                    Log.error(self, "Check the log for details: "
-                              "`tail /var/log/wo/wordops.log` "
-                              "and please try again")
-                if wo_auth and len(wo_auth):
-                    for msg in wo_auth:
-                        Log.info(self, Log.ENDC + msg, log=False)
-                Log.info(self, "Successfully created site"
-                         " http://{0}".format(wo_domain))
+            if data.get('proxy') or data.get('alias') or data.get('subsite'):
+                self._finalize_simple_site(wo_domain, stype, cache,
+                                           wo_site_webroot, wo_auth)
 
             else:
-                if not php_version:
-                    php_version = None
                 addNewSite(self, wo_domain, stype, cache, wo_site_webroot,
                            php_version=php_version)
 
             # Setup database for MySQL site
-            if 'wo_db_name' in data.keys() and not data['wp']:
+            if 'wo_db_name' in data and not data['wp']:
                 try:
                     data = setupdatabase(self, data)
                     # Add database information for site into database
@@ -417,22 +442,24 @@ class WOSiteCreateController(CementBaseController):
                                             data['wo_db_host'])
 
                 try:
-                    wodbconfig = open("{0}/wo-config.php"
-                                      .format(wo_site_webroot),
-                                      encoding='utf-8', mode='w')
-                    wodbconfig.write("<?php \ndefine('DB_NAME', '{0}');"
-                                     "\ndefine('DB_USER', '{1}'); "
-                                     "\ndefine('DB_PASSWORD', '{2}');"
-                                     "\ndefine('DB_HOST', '{3}');\n?>"
-                                     .format(data['wo_db_name'],
-                                             data['wo_db_user'],
-                                             data['wo_db_pass'],
-                                             data['wo_db_host']))
-                    wodbconfig.close()
+                    payload = (f"<?php \ndefine('DB_NAME', '{data['wo_db_name']}');"
+                               f"\ndefine('DB_USER', '{data['wo_db_user']}'); "
+                               f"\ndefine('DB_PASSWORD', '{data['wo_db_pass']}');"
+                               f"\ndefine('DB_HOST', '{data['wo_db_host']}');\n?>"
+                               ).encode('utf-8')
+                    # Holds the database password: create it 0640, never
+                    # through a symlink, with a single unbuffered write
+                    fd = os.open(f"{wo_site_webroot}/wo-config.php",
+                                 os.O_WRONLY | os.O_CREAT | os.O_TRUNC |
+                                 os.O_CLOEXEC | os.O_NOFOLLOW, 0o640)
+                    try:
+                        os.write(fd, payload)
+                    finally:
+                        os.close(fd)
                     stype = 'mysql'
-                except IOError as e:
-                    Log.debug(self, str(e))
-                    Log.debug(self, "Error occured while generating wo-config.php")
+                except OSError as e:
+                    Log.debug(self, "Error occured while generating "
+                              f"wo-config.php: {e}")
                     handle_site_error_cleanup(self, wo_domain, data['webroot'],
                                             data['wo_db_name'], data['wo_db_user'],
                                             data['wo_db_host'])
@@ -440,7 +467,7 @@ class WOSiteCreateController(CementBaseController):
             # Setup WordPress if Wordpress site
             if data['wp']:
                 vhostonly = bool(pargs.vhostonly)
-                try:
+                with _site_create_guard(self, wo_domain, data):
                     wo_wp_creds = setupwordpress(self, data, vhostonly)
                     # Add database information for site into database
                     updateSiteInfo(self, wo_domain,
@@ -448,86 +475,23 @@ class WOSiteCreateController(CementBaseController):
                                    db_user=data['wo_db_user'],
                                    db_password=data['wo_db_pass'],
                                    db_host=data['wo_db_host'])
-                except SiteError as e:
-                    # call cleanup actions on failure
-                    Log.debug(self, str(e))
-                    Log.info(self, Log.FAIL +
-                             "There was a serious error encountered...")
-                    Log.info(self, Log.FAIL + "Cleaning up afterwards...")
-                    doCleanupAction(self, domain=wo_domain,
-                                    webroot=data['webroot'],
-                                    dbname=data['wo_db_name'],
-                                    dbuser=data['wo_db_user'],
-                                    dbhost=data['wo_mysql_grant_host'])
-                    deleteSiteInfo(self, wo_domain)
-                    Log.error(self, "Check the log for details: "
-                              "`tail /var/log/wo/wordops.log` "
-                              "and please try again")
 
-            # Service Nginx Reload call cleanup if failed to reload nginx
             # Configure php-fpm pool for the site
-            try:
+            with _site_create_guard(self, wo_domain, data):
                 setup_php_fpm(self, data)
-            except SiteError as e:
-                Log.debug(self, str(e))
-                Log.info(self, Log.FAIL +
-                         "There was a serious error encountered...")
-                Log.info(self, Log.FAIL + "Cleaning up afterwards...")
-                doCleanupAction(self, domain=wo_domain,
-                                webroot=data['webroot'])
-                if 'wo_db_name' in data.keys():
-                    doCleanupAction(self, domain=wo_domain,
-                                    dbname=data['wo_db_name'],
-                                    dbuser=data['wo_db_user'],
-                                    dbhost=data['wo_mysql_grant_host'])
-                deleteSiteInfo(self, wo_domain)
-                Log.error(self, "Check the log for details: "
-                          "`tail /var/log/wo/wordops.log` "
-                          "and please try again")
 
+            # Service Nginx Reload call cleanup if failed to reload nginx
             if not WOService.reload_service(self, 'nginx'):
-                Log.info(self, Log.FAIL +
-                         "There was a serious error encountered...")
-                Log.info(self, Log.FAIL + "Cleaning up afterwards...")
-                doCleanupAction(self, domain=wo_domain,
-                                webroot=data['webroot'])
-                if 'wo_db_name' in data.keys():
-                    doCleanupAction(self, domain=wo_domain,
-                                    dbname=data['wo_db_name'],
-                                    dbuser=data['wo_db_user'],
-                                    dbhost=data['wo_mysql_grant_host'])
-                deleteSiteInfo(self, wo_domain)
-                Log.info(self, Log.FAIL + "service nginx reload failed."
-                         " check issues with `nginx -t` command.")
-                Log.error(self, "Check the log for details: "
-                          "`tail /var/log/wo/wordops.log` "
-                          "and please try again")
+                _rollback_site(self, wo_domain, data,
+                               "service nginx reload failed."
+                               " check issues with `nginx -t` command.")
 
             WOGit.add(self, ["/etc/nginx"],
-                      msg="{0} created with {1} {2}"
-                      .format(wo_www_domain, stype, cache))
+                      msg=f"{wo_www_domain} created with {stype} {cache}")
             # Setup Permissions for webroot
-            try:
+            with _site_create_guard(self, wo_domain, data):
                 setwebrootpermissions(self, data['webroot'],
-                                      data.get('php_fpm_user',
-                                               WOVar.wo_php_user))
-            except SiteError as e:
-                Log.debug(self, str(e))
-                Log.info(self, Log.FAIL +
-                         "There was a serious error encountered...")
-                Log.info(self, Log.FAIL + "Cleaning up afterwards...")
-                doCleanupAction(self, domain=wo_domain,
-                                webroot=data['webroot'])
-                if 'wo_db_name' in data.keys():
-                    print("Inside db cleanup")
-                    doCleanupAction(self, domain=wo_domain,
-                                    dbname=data['wo_db_name'],
-                                    dbuser=data['wo_db_user'],
-                                    dbhost=data['wo_mysql_grant_host'])
-                deleteSiteInfo(self, wo_domain)
-                Log.error(self, "Check the log for details: "
-                          "`tail /var/log/wo/wordops.log` and "
-                          "please try again")
+                                      data['php_fpm_user'])
 
             if wo_auth and len(wo_auth):
                 for msg in wo_auth:
@@ -535,14 +499,13 @@ class WOSiteCreateController(CementBaseController):
 
             if data['wp'] and (not pargs.vhostonly):
                 Log.info(self, Log.ENDC + "WordPress admin user :"
-                         " {0}".format(wo_wp_creds['wp_user']), log=False)
-                Log.info(self, Log.ENDC + "WordPress admin password : {0}"
-                         .format(wo_wp_creds['wp_pass']), log=False)
+                         f" {wo_wp_creds['wp_user']}", log=False)
+                Log.info(self, Log.ENDC + "WordPress admin password : "
+                         f"{wo_wp_creds['wp_pass']}", log=False)
 
                 display_cache_settings(self, data)
 
-            Log.info(self, "Successfully created site"
-                     " http://{0}".format(wo_domain))
+            Log.info(self, f"Successfully created site http://{wo_domain}")
         except SiteError:
             Log.error(self, "Check the log for details: "
                       "`tail /var/log/wo/wordops.log` and please try again")
@@ -554,8 +517,9 @@ class WOSiteCreateController(CementBaseController):
                                      wo_domain_type, wo_root_domain,
                                      wo_site_webroot)
 
-    def _render_protected(self, data, secure):
-        slug = data.get('pool_name')
+    def _render_protected(self, data, secure, slug=None):
+        if slug is None:
+            slug = data.get('pool_name')
         if not slug:
             return
         acl_dir = f'/etc/nginx/acl/{slug}'
@@ -565,7 +529,7 @@ class WOSiteCreateController(CementBaseController):
             'slug': slug,
             'wp': data.get('wp', False),
             'php_ver': data.get('php_ver'),
-            'pool_name': data.get('pool_name'),
+            'pool_name': slug,
             'secure': secure,
         }
         WOTemplate.deploy(self, protected, 'protected.mustache', pdata, overwrite=True)
@@ -573,9 +537,7 @@ class WOSiteCreateController(CementBaseController):
             passwd = RANDOM.long(self)
             username = data.get('wo_user', WOVar.wo_user)
             cred = os.path.join(acl_dir, 'credentials')
-            WOShellExec.cmd_exec(
-                self,
-                f"printf \"{username}:$(openssl passwd -apr1 {passwd} 2>/dev/null)\\n\" > {cred} 2>/dev/null",
-                log=False)
+            # nginx workers run as www-data and read it on each request
+            write_htpasswd(cred, username, passwd, group=WOVar.wo_php_user)
             Log.info(self, f"HTTP Auth User : {username}")
             Log.info(self, f"HTTP Auth Password : {passwd}")
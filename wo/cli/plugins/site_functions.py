@@ -1,13 +1,18 @@
+import functools
 import getpass
 import glob
+import hashlib
 import json
+import mmap
 import os
-import random
 import re
+import secrets
 import shlex
 import shutil
+import stat
 import string
 import subprocess
+import tempfile
 from subprocess import CalledProcessError
 
 from wo.cli.plugins.sitedb import getSiteInfo, updateSiteInfo, deleteSiteInfo
@@ -19,8 +24,8 @@ from wo.core.domainvalidate import WODomain
 from wo.core.fileutils import WOFileUtils
 from wo.core.git import WOGit
 from wo.core.logging import Log
-from wo.core.mysql import (MySQLConnectionError, StatementExcecutionError,
-                           WOMysql)
+from wo.core.mysql import (DatabaseExistsError, MySQLConnectionError,
+                           StatementExcecutionError, WOMysql)
 from wo.core.services import WOService
 from wo.core.shellexec import CommandExecutionError, WOShellExec
 from wo.core.sslutils import SSL
@@ -33,7 +38,6 @@ SITE_CONSTANTS = {
     'DEFAULT_USERNAME_LENGTH': 12,
     'DEFAULT_WP_PREFIX': 'wp_',
     'DEFAULT_WP_USER': 'admin',
-    'DEVNULL_PATH': os.devnull,
     'NGINX_CONFIG_PATH': '/etc/nginx/sites-available',
     'NGINX_ENABLED_PATH': '/etc/nginx/sites-enabled',
     'NGINX_LOG_PATH': '/var/log/nginx',
@@ -44,11 +48,27 @@ SITE_CONSTANTS = {
 
 BACKUP_SITE_TYPES = ['html', 'php', 'proxy', 'mysql']
 
+# Matches define('DB_*', 'value') in wp-config.php, with either quote style;
+# the value runs to the quote that opened it, so it may hold the other one.
+# Bytes pattern so it can scan a memory-mapped file directly. Anchored to
+# the start of a line so commented-out defines (// or #) are skipped
+_WP_DB_DEFINE_RE = re.compile(
+    rb"""^[ \t]*(?:<\?php[ \t]+)?define\(\s*['"](DB_NAME|DB_USER|DB_PASSWORD|DB_HOST)['"]\s*,"""
+    rb"""\s*(['"])(.*?)\2""", re.MULTILINE)
+
+# Read-only opens that should not dirty the inode atime (Linux only)
+_O_NOATIME = getattr(os, 'O_NOATIME', 0)
+
+# Input validation patterns, compiled once instead of on every prompt
+_WP_PREFIX_RE = re.compile(r'^[A-Za-z0-9_]*$')
+_WP_USER_RE = re.compile(r'^[A-Za-z0-9 _\.\-@]+$')
+_WP_EMAIL_RE = re.compile(r"^[A-Za-z0-9\.\+_-]+@[A-Za-z0-9\._-]+\.[a-zA-Z]*$")
+
 # Shared utility functions
-def execute_command_safely(controller, command, error_message, log_command=True):
+def execute_command_safely(controller, command, error_message, log_command=True, **exec_kwargs):
     """Execute shell command with standardized error handling"""
     try:
-        ok = WOShellExec.cmd_exec(controller, command, log=log_command)
+        ok = WOShellExec.cmd_exec(controller, command, log=log_command, **exec_kwargs)
         if not ok:
             raise SiteError(error_message)
         return True
@@ -64,39 +84,62 @@ def log_failure(controller, message="Failed"):
     """Standardized failure logging"""
     Log.info(controller, f"[{Log.ENDC}{Log.FAIL}{message}{Log.OKBLUE}]")
 
+def _wp_option(key, value):
+    """Render one wp-cli --option; False drops it, True/None make it a flag"""
+    if value is None or value is True:
+        return f"--{key}"
+    if value is False:
+        return None
+    return f"--{key}={shlex.quote(str(value))}"
+
+
 def build_wp_command(action, *args, **kwargs):
-    base_cmd = f"{WOVar.wo_wpcli_path} --allow-root {action}"
-
-    arg_tokens = []
-    for arg in args:
-        if arg is None:
-            continue
-        arg_text = str(arg)
-        if not arg_text:
-            continue
-        arg_tokens.append(shlex.quote(arg_text))
-
-    if arg_tokens:
-        base_cmd += " " + " ".join(arg_tokens)
-
-    if kwargs:
-        options = []
-        for key, value in kwargs.items():
-            if isinstance(value, bool):
-                if value:
-                    options.append(f"--{key}")
-            elif value is None:
-                options.append(f"--{key}")
-            else:
-                options.append(f"--{key}={shlex.quote(str(value))}")
-        if options:
-            base_cmd += " " + " ".join(options)
+    parts = [f"{WOVar.wo_wpcli_path} --allow-root {action}"]
+    parts += [shlex.quote(text) for text in
+              (str(arg) for arg in args if arg is not None) if text]
+    parts += [option for option in
+              (_wp_option(key, value) for key, value in kwargs.items())
+              if option]
+    return " ".join(parts)
+
+
+def _php_quote(value):
+    """Return value as a single-quoted PHP string literal."""
+    return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def build_wp_batch(commands, skip_wordpress=False, path=None):
+    """
+    Build one wp-cli run that executes several commands in-process.
 
-    return base_cmd
+    Each command is an (args, flags) pair, e.g.
+    (['option', 'update', 'blogname', 'Site'], ()) or
+    (['config', 'set', 'WP_CACHE', 'true'], ('raw',)). They are replayed
+    through WP_CLI::run_command from a script fed to `wp eval-file -`,
+    so PHP and WordPress bootstrap once instead of once per command.
+    path is passed on as --path, so the caller need not chdir.
+
+    Returns:
+        tuple: (args_list, script) for WOShellExec.cmd_exec(input_data=)
+    """
+    script = ["<?php"]
+    for args, flags in commands:
+        positional = ", ".join(_php_quote(str(arg)) for arg in args)
+        assoc = ", ".join(f"{_php_quote(flag)} => true" for flag in flags)
+        script.append(f"WP_CLI::run_command([{positional}], [{assoc}]);")
+
+    args = [WOVar.wo_wpcli_path, "--allow-root", "eval-file", "-"]
+    if skip_wordpress:
+        args.append("--skip-wordpress")
+    if path:
+        args.append(f"--path={path}")
+    return args, "\n".join(script) + "\n"
 
 def validate_input_regex(value, pattern, error_message):
-    """Validate input against regex pattern"""
-    if not re.match(pattern, value):
+    """Validate input against regex pattern (a string or compiled pattern)"""
+    if isinstance(pattern, str):
+        pattern = re.compile(pattern)
+    if not pattern.match(value):
         raise SiteError(error_message)
     return True
 
@@ -130,7 +173,7 @@ class PHPVersionManager:
     def get_selected_versions(cls, pargs):
         """Get all selected PHP versions from parsed arguments"""
         return [version for version in cls.SUPPORTED_VERSIONS
-                if hasattr(pargs, version) and getattr(pargs, version)]
+                if getattr(pargs, version, False)]
 
     @classmethod
     def validate_single_version(cls, pargs):
@@ -165,8 +208,9 @@ def pre_run_checks(self):
     Log.wait(self, "Running pre-run checks")
     try:
         Log.debug(self, "checking NGINX configuration ...")
-        with open('/dev/null', 'w') as fnull:
-            subprocess.check_call(["/usr/sbin/nginx", "-t"], stdout=fnull, stderr=subprocess.STDOUT)
+        subprocess.check_call(["/usr/sbin/nginx", "-t"],
+                              stdout=subprocess.DEVNULL,
+                              stderr=subprocess.STDOUT)
     except CalledProcessError as e:
         Log.failed(self, "Running pre-update checks")
         Log.debug(self, f"{e}")
@@ -174,8 +218,11 @@ def pre_run_checks(self):
     else:
         Log.valide(self, "Running pre-update checks")
 
-def _create_nginx_config(controller, domain_name, data):
-    """Create and validate nginx configuration file"""
+def _create_nginx_config(controller, domain_name, data, validate=True):
+    """Create and validate nginx configuration file
+
+    With validate=False the `nginx -t` run is left to the caller.
+    """
     Log.info(controller, "Setting up NGINX configuration \t", end='')
 
     config_path = f"{SITE_CONSTANTS['NGINX_CONFIG_PATH']}/{domain_name}"
@@ -187,12 +234,16 @@ def _create_nginx_config(controller, domain_name, data):
         Log.debug(controller, str(e))
         raise SiteError("create nginx configuration failed for site")
 
+    if not validate:
+        log_success(controller)
+        return
+
     # Validate nginx configuration
     try:
         Log.debug(controller, "Checking generated nginx conf, please wait...")
-        with open(SITE_CONSTANTS['DEVNULL_PATH'], 'w') as fnull:
-            subprocess.check_call(["/usr/sbin/nginx", "-t"],
-                                stdout=fnull, stderr=subprocess.STDOUT)
+        subprocess.check_call(["/usr/sbin/nginx", "-t"],
+                              stdout=subprocess.DEVNULL,
+                              stderr=subprocess.STDOUT)
         log_success(controller)
     except CalledProcessError as e:
         Log.debug(controller, str(e))
@@ -220,8 +271,7 @@ def _setup_webroot_directories(controller, domain_name, webroot):
     try:
         # Create directories
         for directory in directories:
-            if not os.path.exists(directory):
-                os.makedirs(directory)
+            os.makedirs(directory, exist_ok=True)
 
         # Create log symlinks
         log_types = ['access', 'error']
@@ -232,16 +282,12 @@ def _setup_webroot_directories(controller, domain_name, webroot):
 
     except Exception as e:
         Log.debug(controller, str(e))
-        raise SiteError("setup webroot failed for site")
-
-    # Verify directories were created
-    required_dirs = [f'{webroot}/htdocs', f'{webroot}/logs']
-    if all(os.path.exists(directory) for directory in required_dirs):
-        log_success(controller)
-    else:
         log_failure(controller)
         raise SiteError("setup webroot failed for site")
 
+    # makedirs either created every directory or raised above
+    log_success(controller)
+
 
 def check_domain_exists(self, domain):
     if getSiteInfo(self, domain):
@@ -249,18 +295,21 @@ def check_domain_exists(self, domain):
     return False
 
 
-def setupdomain(self, data):
+def setupdomain(self, data, validate=True):
     """
     Setup domain configuration - refactored for better maintainability.
 
     Args:
         data (dict): Site configuration data containing 'site_name' and 'webroot'
+        validate (bool): Run `nginx -t` after writing the vhost. Callers
+            that test the configuration themselves (e.g. when reloading
+            nginx) can pass False to skip the extra full config parse.
     """
     domain_name = data['site_name']
     webroot = data['webroot']
 
     # Create and validate nginx configuration
-    _create_nginx_config(self, domain_name, data)
+    _create_nginx_config(self, domain_name, data, validate=validate)
 
     # Enable the site by creating symlink
     _create_nginx_symlink(self, domain_name)
@@ -286,26 +335,28 @@ def setup_php_fpm(self, data):
 
     Log.info(self, 'Configuring PHP-FPM pool \t', end='')
     try:
-        # create system user and group
-        WOShellExec.cmd_exec(self,
-                             f"getent group {php_fpm_user} > /dev/null 2>&1 || groupadd -r {php_fpm_user}")
-        WOShellExec.cmd_exec(self,
-                             f"id -u {php_fpm_user} > /dev/null 2>&1 || useradd -r -g {php_fpm_user} -M -d /nonexistent -s /usr/sbin/nologin {php_fpm_user}")
-        # add nginx user to php-fpm-user group (grant perm to connect to php-fpm socket)
-        WOShellExec.cmd_exec(self,
-                             f"usermod -aG {php_fpm_user} {WOVar.wo_php_user}")
+        # create system user and group, then add nginx user to
+        # php-fpm-user group (grant perm to connect to php-fpm socket);
+        # one shell runs all three
+        WOShellExec.cmd_exec(
+            self,
+            f"getent group {php_fpm_user} > /dev/null 2>&1 || groupadd -r {php_fpm_user}; "
+            f"id -u {php_fpm_user} > /dev/null 2>&1 || useradd -r -g {php_fpm_user} -M -d /nonexistent -s /usr/sbin/nologin {php_fpm_user}; "
+            f"usermod -aG {php_fpm_user} {WOVar.wo_php_user}")
 
         log_dir = f"/var/log/php/{php_version}/{slug}"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        os.makedirs(log_dir, exist_ok=True)
         WOFileUtils.chown(self, log_dir, php_fpm_user, php_fpm_user, recursive=True)
 
         service_path = f"/etc/systemd/system/php{php_version}-fpm@.service"
         service_data = {'php_ver': php_ver, 'php_version': php_version}
-        if not os.path.isfile(service_path):
-            with open(service_path, 'w') as service_file:
+        # The templated unit is shared by every pool of this PHP version
+        try:
+            with open(service_path, 'x') as service_file:
                 self.app.render(service_data, 'php-fpm-service.mustache',
                                 out=service_file)
+        except FileExistsError:
+            pass
 
         master_path = f"/etc/php/{php_version}/fpm/php-fpm-{slug}.conf"
         with open(master_path, 'w') as master_file:
@@ -321,8 +372,8 @@ def setup_php_fpm(self, data):
             self.app.render(pool_data, 'php-fpm-pool.mustache',
                             out=pool_file)
 
-        WOShellExec.cmd_exec(self, 'systemctl daemon-reload')
-        WOShellExec.cmd_exec(self, f'systemctl enable php{php_version}-fpm@{slug}')
+        WOShellExec.cmd_exec(self, 'systemctl daemon-reload && '
+                             f'systemctl enable php{php_version}-fpm@{slug}')
         WOService.restart_service(self, f'php{php_version}-fpm@{slug}')
     except Exception as e:
         Log.debug(self, str(e))
@@ -353,19 +404,22 @@ def cleanup_php_fpm(self, slug, php_ver, php_version, delete_vhost=True):
             WOShellExec.cmd_exec(self, f'groupdel {php_fpm_user} || true', log=False)
 
         # Paths to clean. Keep php_ver/php_version consistent with how they’re created.
-        paths = [
-            f'/etc/php/{php_version}/fpm/php-fpm-{slug}.conf',
-            f'/etc/php/{php_version}/fpm/pool.d/{slug}.conf',
+        fpm_dir = f'/etc/php/{php_version}/fpm'
+        paths = (
+            f'{fpm_dir}/php-fpm-{slug}.conf',
+            f'{fpm_dir}/pool.d/{slug}.conf',
             f'/var/log/php/{php_version}/{slug}',
             f'/run/php/php{php_ver}-fpm-{slug}.sock',
             f'/run/php/php{php_version}-fpm-{slug}.pid',
-        ]
+        )
 
         for path in paths:
             try:
-                if os.path.isdir(path):
+                # One lstat decides how to remove it; a symlink to a
+                # directory is unlinked, not followed
+                if stat.S_ISDIR(os.lstat(path).st_mode):
                     shutil.rmtree(path, ignore_errors=True)
-                elif os.path.isfile(path) or os.path.islink(path):
+                else:
                     os.remove(path)
             except FileNotFoundError:
                 pass
@@ -381,6 +435,12 @@ def cleanup_php_fpm(self, slug, php_ver, php_version, delete_vhost=True):
     else:
         Log.info(self, '[' + Log.ENDC + 'Done' + Log.OKBLUE + ']')
 
+
+# '-' and '.' become '_' in database names, or are dropped with '_'
+_DB_NAME_TO_UNDERSCORE = str.maketrans('-.', '__')
+_DB_NAME_STRIP = str.maketrans('', '', '-._')
+
+
 def _process_domain_for_database(domain_name):
     """
     Process domain name for database naming conventions.
@@ -391,9 +451,8 @@ def _process_domain_for_database(domain_name):
     Returns:
         dict: Processed domain variations
     """
-    wo_replace_dash = domain_name.replace('-', '_')
-    wo_replace_dot = wo_replace_dash.replace('.', '_')
-    wo_replace_underscore = wo_replace_dot.replace('_', '')
+    wo_replace_dot = domain_name.translate(_DB_NAME_TO_UNDERSCORE)
+    wo_replace_underscore = domain_name.translate(_DB_NAME_STRIP)
 
     return {
         'dot_replaced': wo_replace_dot,
@@ -402,6 +461,12 @@ def _process_domain_for_database(domain_name):
     }
 
 
+# Spellings wo.conf uses for an enabled boolean option. getboolean would
+# also accept yes/on/1 and raise on anything else, changing what existing
+# wo.conf files mean
+_CONFIG_TRUE = frozenset(('True', 'true'))
+
+
 def _get_mysql_config(controller):
     """
     Get MySQL configuration settings with defaults.
@@ -412,11 +477,12 @@ def _get_mysql_config(controller):
     Returns:
         dict: MySQL configuration
     """
-    if controller.app.config.has_section('mysql'):
+    config = controller.app.config
+    if config.has_section('mysql'):
         return {
-            'prompt_dbname': controller.app.config.get('mysql', 'db-name') in ['True', 'true'],
-            'prompt_dbuser': controller.app.config.get('mysql', 'db-user') in ['True', 'true'],
-            'grant_host': controller.app.config.get('mysql', 'grant-host')
+            'prompt_dbname': config.get('mysql', 'db-name') in _CONFIG_TRUE,
+            'prompt_dbuser': config.get('mysql', 'db-user') in _CONFIG_TRUE,
+            'grant_host': config.get('mysql', 'grant-host')
         }
     else:
         return {
@@ -508,6 +574,11 @@ WP_CACHE_ENABLER_CONFIG = {
     "minify_html": 1
 }
 
+# Option payloads passed to wp-cli, serialized once at import
+_WP_NGINX_HELPER_JSON = {mode: json.dumps(options)
+                         for mode, options in WP_NGINX_HELPER_CONFIG.items()}
+_WP_CACHE_ENABLER_JSON = json.dumps(WP_CACHE_ENABLER_CONFIG)
+
 WP_CONFIG_VARIABLES = [
     ['WP_MEMORY_LIMIT', '256M'],
     ['WP_MAX_MEMORY_LIMIT', '512M'],
@@ -539,10 +610,10 @@ def _setup_wp_prefix(controller, prompt_prefix):
     """Setup WordPress table prefix with validation"""
     wo_wp_prefix = 'wp_'  # Default value
 
-    if prompt_prefix in ['True', 'true']:
+    if prompt_prefix is True or prompt_prefix in _CONFIG_TRUE:
         try:
             wo_wp_prefix = input('Enter the WordPress table prefix [wp_]: ')
-            while wo_wp_prefix and not re.match('^[A-Za-z0-9_]*$', wo_wp_prefix):
+            while wo_wp_prefix and not _WP_PREFIX_RE.match(wo_wp_prefix):
                 Log.warn(controller, "table prefix can only contain numbers, letters, and underscores")
                 wo_wp_prefix = input('Enter the WordPress table prefix [wp_]: ')
         except EOFError:
@@ -550,6 +621,14 @@ def _setup_wp_prefix(controller, prompt_prefix):
 
     return wo_wp_prefix or 'wp_'
 
+
+# --extra-php snippets for wp config create; WPMU_ACCEL_REDIRECT lets
+# NGINX serve multisite uploads
+_WP_EXTRA_PHP_SINGLE = "define('WP_DEBUG', false);\n"
+_WP_EXTRA_PHP_MULTI = (_WP_EXTRA_PHP_SINGLE +
+                       "define('WPMU_ACCEL_REDIRECT', true);\n")
+
+
 def _create_wp_config_command(data, wp_prefix, skip_check: bool, extra_php: str):
     """
     Build wp-cli arguments (no shell) and return (args_list, extra_php_str).
@@ -592,14 +671,9 @@ def _create_wp_config(controller, data, wp_prefix, vhostonly):
     else:
         Log.debug(controller, "Generating wp-config for WordPress single site")
 
-    # Compose the PHP snippet once, based on mode.
-    # Keep it minimal here; wp core multisite-install will add network constants later.
-    extra_lines = ["define('WP_DEBUG', false);"]
-    if is_multisite:
-        # Useful with NGINX for MU file serving; harmless otherwise.
-        extra_lines.append("define('WPMU_ACCEL_REDIRECT', true);")
-
-    extra_php = "\n".join(extra_lines) + "\n"
+    # Keep the snippet minimal; wp core multisite-install adds the
+    # network constants later.
+    extra_php = _WP_EXTRA_PHP_MULTI if is_multisite else _WP_EXTRA_PHP_SINGLE
 
     # Build args (no shell) and feed snippet via stdin.
     args, extra_php = _create_wp_config_command(data, wp_prefix, skip_check, extra_php)
@@ -612,35 +686,43 @@ def _create_wp_config(controller, data, wp_prefix, vhostonly):
     except CommandExecutionError:
         raise SiteError(f"generate wp-config failed for wp {site_type}")
 
+
 def _configure_wp_variables(controller, domain_name):
     """Configure WordPress variables in wp-config.php"""
     # Add domain-specific Redis prefix
     wp_conf_variables = [['WP_REDIS_PREFIX', f'{domain_name}:']] + WP_CONFIG_VARIABLES
 
-    Log.wait(controller, "Configuring WordPress")
-    for wp_var, wp_val in wp_conf_variables:
-        var_raw = wp_val in ['true', 'false']
-        raw_flag = '--raw' if var_raw else ''
+    # Every `config set` runs inside a single wp-cli process instead of
+    # bootstrapping PHP once per constant
+    args, script = build_wp_batch(
+        [(['config', 'set', wp_var, wp_val],
+          ('raw',) if wp_val in ['true', 'false'] else ())
+         for wp_var, wp_val in wp_conf_variables],
+        skip_wordpress=True)
 
-        try:
-            cmd = f"/bin/bash -c \"{WOVar.wo_wpcli_path} --allow-root config set {wp_var} '{wp_val}' {raw_flag}\""
-            WOShellExec.cmd_exec(controller, cmd)
-        except CommandExecutionError as e:
-            Log.failed(controller, "Configuring WordPress")
-            Log.debug(controller, str(e))
-            Log.error(controller, 'Unable to define wp-config.php variables')
+    Log.wait(controller, "Configuring WordPress")
+    try:
+        defined = WOShellExec.cmd_exec(controller, args, input_data=script)
+    except CommandExecutionError as e:
+        Log.debug(controller, str(e))
+        defined = False
+    if not defined:
+        Log.failed(controller, "Configuring WordPress")
+        Log.error(controller, 'Unable to define wp-config.php variables')
 
     Log.valide(controller, "Configuring WordPress")
 
 
 def _move_wp_config(controller, webroot):
     """Move wp-config.php outside webroot for security"""
-    current_path = os.getcwd() + '/wp-config.php'
-    target_path = os.path.abspath(os.path.join(os.getcwd(), os.pardir))
+    cwd = os.getcwd()
+    current_path = os.path.join(cwd, 'wp-config.php')
+    target_path = os.path.join(os.path.dirname(cwd), 'wp-config.php')
 
     try:
         Log.debug(controller, f"Moving file from {current_path} to {target_path}")
-        shutil.move(current_path, target_path)
+        # htdocs and its parent share a filesystem, so this is one rename
+        os.replace(current_path, target_path)
     except Exception as e:
         Log.debug(controller, str(e))
         Log.error(controller, f'Unable to move file from {current_path} to {target_path}', False)
@@ -653,8 +735,7 @@ def _validate_wp_credentials(controller, wp_user, wp_email):
     if not wp_user:
         wp_user = WOVar.wo_user
 
-    username_regex = r'^[A-Za-z0-9 _\.\-@]+$'
-    while not wp_user or not re.match(username_regex, wp_user):
+    while not wp_user or not _WP_USER_RE.match(wp_user):
         Log.warn(controller, "Username can have only alphanumeric characters, spaces, underscores, hyphens, periods and the @ symbol.")
         try:
             wp_user = input('Enter WordPress username: ')
@@ -671,9 +752,8 @@ def _validate_wp_credentials(controller, wp_user, wp_email):
                 raise SiteError("input WordPress username failed")
 
     # Email format validation
-    email_regex = r"^[A-Za-z0-9\.\+_-]+@[A-Za-z0-9\._-]+\.[a-zA-Z]*$"
     try:
-        while not re.match(email_regex, wp_email):
+        while not _WP_EMAIL_RE.match(wp_email):
             Log.info(controller, "EMail not Valid in config, Please provide valid email id")
             wp_email = input("Enter your email: ")
     except EOFError:
@@ -723,15 +803,17 @@ def _setup_wordpress_permalinks(controller):
 
 def _setup_cache_plugins(controller, data):
     """Setup cache plugins based on site configuration"""
-    # Always install nginx-helper
-    installwp_plugin(controller, 'nginx-helper', data)
+    # nginx-helper only matters with a cache to purge; `wo site update`
+    # installs it when a plain site later switches to a purgeable cache
+    if any(data.get(cache) for cache in ('wpfc', 'wpredis', 'wpsc', 'wpce')):
+        installwp_plugin(controller, 'nginx-helper', data)
 
     # Configure nginx-helper based on cache type
     if data.get('wpfc'):
-        plugin_data = json.dumps(WP_NGINX_HELPER_CONFIG['fastcgi'])
+        plugin_data = _WP_NGINX_HELPER_JSON['fastcgi']
         setupwp_plugin(controller, "nginx-helper", "rt_wp_nginx_helper_options", plugin_data, data)
     elif data.get('wpredis'):
-        plugin_data = json.dumps(WP_NGINX_HELPER_CONFIG['redis'])
+        plugin_data = _WP_NGINX_HELPER_JSON['redis']
         setupwp_plugin(controller, 'nginx-helper', 'rt_wp_nginx_helper_options', plugin_data, data)
 
     # Install additional cache plugins
@@ -743,12 +825,13 @@ def _setup_cache_plugins(controller, data):
 
     if data.get('wpce'):
         installwp_plugin(controller, 'cache-enabler', data)
-        plugin_data = json.dumps(WP_CACHE_ENABLER_CONFIG)
+        plugin_data = _WP_CACHE_ENABLER_JSON
         setupwp_plugin(controller, 'cache-enabler', 'cache-enabler', plugin_data, data)
 
         # Enable WP_CACHE constant
-        cmd = f"/bin/bash -c \"{WOVar.wo_wpcli_path} --allow-root config set WP_CACHE true --raw\""
-        WOShellExec.cmd_exec(controller, cmd)
+        WOShellExec.cmd_exec(controller, [WOVar.wo_wpcli_path, "--allow-root",
+                                          "config", "set", "WP_CACHE", "true",
+                                          "--raw"])
 
 
 def _normalise_template_source(entry, entry_type, index):
@@ -783,12 +866,11 @@ def load_wp_template(controller, template_path):
     """Load and validate a WordPress provisioning template from JSON."""
     resolved_path = os.path.abspath(os.path.expanduser(template_path))
 
-    if not os.path.isfile(resolved_path):
-        raise SiteError(f"WordPress template file '{resolved_path}' does not exist.")
-
     try:
         with open(resolved_path, 'r', encoding='utf-8') as handler:
             payload = json.load(handler)
+    except (FileNotFoundError, IsADirectoryError):
+        raise SiteError(f"WordPress template file '{resolved_path}' does not exist.")
     except (OSError, ValueError) as e:
         Log.debug(controller, str(e))
         raise SiteError("Unable to load WordPress template JSON file.")
@@ -869,6 +951,14 @@ def _generate_database_username(domain_processed, max_length=12):
     return f"{base_name}{random_suffix}"
 
 
+# SiteError message for each statement _create_database_and_user runs
+_DB_SETUP_ERRORS = (
+    "create database execution failed",
+    "creating user failed for database",
+    "grant privileges to user failed for database",
+)
+
+
 def _create_database_and_user(controller, wo_db_name, wo_db_username, wo_db_password, wo_mysql_grant_host):
     """
     Create database and user with proper error handling.
@@ -886,46 +976,52 @@ def _create_database_and_user(controller, wo_db_name, wo_db_username, wo_db_pass
     Log.info(controller, "Setting up database\t\t", end='')
     Log.debug(controller, "Creating database {0}".format(wo_db_name))
 
-    # Handle existing database by generating new name
-    try:
-        if WOMysql.check_db_exists(controller, wo_db_name):
+    # Create database, user and privileges over one connection. An
+    # existing database is reported by the create itself, which saves
+    # a separate connection to probe for it first
+    while True:
+        Log.debug(controller, "Creating user {0} and setting up privileges"
+                  .format(wo_db_username))
+        statements = (
+            "create database `{0}`".format(wo_db_name),
+            "create user `{0}`@`{1}` identified by '{2}'"
+            .format(wo_db_username, wo_mysql_grant_host, wo_db_password),
+            "grant select, insert, update, delete, create, drop, "
+            "references, index, alter, create temporary tables, "
+            "lock tables, execute, create view, show view, "
+            "create routine, alter routine, event, "
+            "trigger on `{0}`.* to `{1}`@`{2}`"
+            .format(wo_db_name, wo_db_username, wo_mysql_grant_host),
+        )
+        try:
+            # log=False: the create user statement holds the password
+            WOMysql.execute_many(controller, statements, log=False)
+            break
+        except DatabaseExistsError:
+            # Handle existing database by generating new name
             Log.debug(controller, "Database already exists, Updating DB_NAME .. ")
             wo_db_name = _generate_database_name(wo_db_name, 32)
             wo_db_username = _generate_database_username(wo_db_name, 12)
-    except MySQLConnectionError:
-        raise SiteError("MySQL Connectivity problem occured")
-
-    # Create database
-    try:
-        WOMysql.execute(controller, "create database `{0}`".format(wo_db_name))
-    except StatementExcecutionError:
-        Log.info(controller, "[" + Log.ENDC + Log.FAIL + "Failed" + Log.OKBLUE + "]")
-        raise SiteError("create database execution failed")
-
-    # Create user
-    Log.debug(controller, "Creating user {0}".format(wo_db_username))
-    try:
-        WOMysql.execute(controller,
-                        "create user `{0}`@`{1}` identified by '{2}'"
-                        .format(wo_db_username, wo_mysql_grant_host, wo_db_password),
-                        log=False)
-    except StatementExcecutionError:
-        Log.info(controller, "[" + Log.ENDC + Log.FAIL + "Failed" + Log.OKBLUE + "]")
-        raise SiteError("creating user failed for database")
-
-    # Grant permissions
-    Log.debug(controller, "Setting up user privileges")
-    try:
-        WOMysql.execute(controller,
-                        "grant select, insert, update, delete, create, drop, "
-                        "references, index, alter, create temporary tables, "
-                        "lock tables, execute, create view, show view, "
-                        "create routine, alter routine, event, "
-                        "trigger on `{0}`.* to `{1}`@`{2}`"
-                        .format(wo_db_name, wo_db_username, wo_mysql_grant_host))
-    except StatementExcecutionError:
-        Log.info(controller, "[" + Log.ENDC + Log.FAIL + "Failed" + Log.OKBLUE + "]")
-        raise SiteError("grant privileges to user failed for database")
+        except MySQLConnectionError:
+            Log.info(controller, "[" + Log.ENDC + Log.FAIL + "Failed" + Log.OKBLUE + "]")
+            raise SiteError("MySQL Connectivity problem occured")
+        except StatementExcecutionError as e:
+            failed = e.args[0] if e.args else 0
+            Log.info(controller, "[" + Log.ENDC + Log.FAIL + "Failed" + Log.OKBLUE + "]")
+            # DDL is not transactional, so drop what was already created
+            # rather than leave a half-provisioned database behind
+            undo = []
+            if failed > 1:
+                undo.append("drop user if exists `{0}`@`{1}`"
+                            .format(wo_db_username, wo_mysql_grant_host))
+            if failed > 0:
+                undo.append("drop database if exists `{0}`".format(wo_db_name))
+            if undo:
+                try:
+                    WOMysql.execute_many(controller, undo)
+                except (MySQLConnectionError, StatementExcecutionError):
+                    Log.debug(controller, "Unable to drop partially created database")
+            raise SiteError(_DB_SETUP_ERRORS[failed])
 
     return wo_db_name, wo_db_username
 
@@ -1010,12 +1106,13 @@ def _get_wordpress_config(controller, data):
         dict: WordPress configuration
     """
     # Get base config from app
-    if controller.app.config.has_section('wordpress'):
+    config = controller.app.config
+    if config.has_section('wordpress'):
         base_config = {
-            'user': controller.app.config.get('wordpress', 'user'),
-            'password': controller.app.config.get('wordpress', 'password'),
-            'email': controller.app.config.get('wordpress', 'email'),
-            'prompt_prefix': controller.app.config.get('wordpress', 'prefix') in ['True', 'true']
+            'user': config.get('wordpress', 'user'),
+            'password': config.get('wordpress', 'password'),
+            'email': config.get('wordpress', 'email'),
+            'prompt_prefix': config.get('wordpress', 'prefix') in _CONFIG_TRUE
         }
     else:
         base_config = {
@@ -1135,9 +1232,8 @@ def setupwordpressnetwork(self, data):
 
 def _execute_wp_plugin_command(controller, webroot, action, plugin_name, **options):
     """Execute WordPress plugin command with standardized error handling"""
-    WOFileUtils.chdir(controller, f'{webroot}/htdocs/')
-
-    cmd = build_wp_command(f"plugin {action}", plugin_name, **options)
+    cmd = build_wp_command(f"plugin {action}", plugin_name,
+                           path=f'{webroot}/htdocs', **options)
 
     execute_command_safely(controller, cmd, f"plugin {action} failed")
 
@@ -1162,9 +1258,8 @@ def _log_plugin_operation(controller, action, plugin_name, success=True):
 
 def _execute_wp_theme_command(controller, webroot, action, theme_name, **options):
     """Execute WordPress theme command with standardized error handling"""
-    WOFileUtils.chdir(controller, f'{webroot}/htdocs/')
-
-    cmd = build_wp_command(f"theme {action}", theme_name, **options)
+    cmd = build_wp_command(f"theme {action}", theme_name,
+                           path=f'{webroot}/htdocs', **options)
     execute_command_safely(controller, cmd, f"theme {action} failed")
 
 
@@ -1243,6 +1338,50 @@ def installwp_plugin(self, plugin_source, data, activate=True, network=None, act
         raise e
 
 
+def installwp_plugins(self, plugin_slugs, data):
+    """
+    Install several plugins in one wp-cli run, without activating them
+    (see activatewp_plugins).
+
+    Args:
+        plugin_slugs (list): Plugin slugs, zip paths or URLs to install
+        data (dict): Site data containing webroot
+    """
+    names = ", ".join(plugin_slugs)
+    Log.wait(self, f"Installing plugin {names}")
+
+    try:
+        cmd = build_wp_command("plugin install", *plugin_slugs,
+                               path=f"{data['webroot']}/htdocs")
+        execute_command_safely(self, cmd, "plugin install failed")
+        _log_plugin_operation(self, "install", names, success=True)
+        return 1
+    except SiteError as e:
+        _log_plugin_operation(self, "install", names, success=False)
+        raise e
+
+
+def activatewp_plugins(self, plugin_names, data, network=False):
+    """
+    Activate several installed plugins in one wp-cli run.
+
+    Args:
+        plugin_names (list): Plugin slugs to activate
+        data (dict): Site data containing webroot
+        network (bool): Network-activate (multisite)
+    """
+    names = ", ".join(plugin_names)
+    Log.wait(self, f"Setting plugin {names}")
+    try:
+        cmd = build_wp_command("plugin activate", *plugin_names,
+                               path=f"{data['webroot']}/htdocs", network=network)
+        execute_command_safely(self, cmd, "plugin activate failed")
+        _log_plugin_operation(self, "activate", names, success=True)
+    except SiteError as e:
+        _log_plugin_operation(self, "activate", names, success=False)
+        raise e
+
+
 def uninstallwp_plugin(self, plugin_name, data):
     """
     Deactivate and uninstall WordPress plugin - refactored for better maintainability.
@@ -1278,17 +1417,18 @@ def setupwp_plugin(self, plugin_name, plugin_option, plugin_data, data):
         plugin_data (str): JSON data for the option
         data (dict): Site data containing webroot and multisite info
     """
-    webroot = data['webroot']
+    htdocs = f"{data['webroot']}/htdocs"
     Log.wait(self, f"Setting plugin {plugin_name}")
-    WOFileUtils.chdir(self, f'{webroot}/htdocs/')
 
     try:
         if data.get('multisite'):
             # Multisite: use network meta update
-            cmd = build_wp_command("network meta update", "1", plugin_option, plugin_data)
+            cmd = build_wp_command("network meta update", "1", plugin_option,
+                                   plugin_data, path=htdocs)
         else:
             # Single site: use option update
-            cmd = build_wp_command("option update", plugin_option, plugin_data)
+            cmd = build_wp_command("option update", plugin_option,
+                                   plugin_data, path=htdocs)
 
         execute_command_safely(self, cmd, "plugin setup failed")
         _log_plugin_operation(self, "setup", plugin_name, success=True)
@@ -1298,20 +1438,38 @@ def setupwp_plugin(self, plugin_name, plugin_option, plugin_data, data):
         raise e
 
 
-def update_wp_options(self, options, data):
-    """Update WordPress options using WP-CLI."""
-    if not options:
-        return
+def update_wp_options(self, options, data, plugin_options=None):
+    """
+    Update WordPress and plugin options in one wp-cli run.
 
-    webroot = data['webroot']
-    WOFileUtils.chdir(self, f'{webroot}/htdocs/')
+    Args:
+        options (dict): Site option name to value
+        data (dict): Site data containing webroot and multisite info
+        plugin_options (dict): Plugin name to its option dict; on
+            multisite these are written with network meta update
+    """
+    commands = []
+    # Multisite: use network meta update, single site: option update
+    prefix = (['network', 'meta', 'update', '1'] if data.get('multisite')
+              else ['option', 'update'])
+    for plugin_settings in (plugin_options or {}).values():
+        commands += [(prefix + [name, _serialise_wp_option_value(value)], ())
+                     for name, value in plugin_settings.items()]
+    commands += [(['option', 'update', name, _serialise_wp_option_value(value)], ())
+                 for name, value in (options or {}).items()]
+    if not commands:
+        return
 
-    for option_name, option_value in options.items():
-        Log.wait(self, f"Updating WordPress option {option_name}")
-        option_payload = _serialise_wp_option_value(option_value)
-        cmd = build_wp_command("option update", option_name, option_payload)
-        execute_command_safely(self, cmd, f"updating option {option_name} failed")
-        Log.valide(self, f"Updating WordPress option {option_name}")
+    names = ", ".join([*(plugin_options or {}), *(options or {})])
+    Log.wait(self, f"Updating WordPress options {names}")
+    args, script = build_wp_batch(commands, path=f"{data['webroot']}/htdocs")
+    try:
+        execute_command_safely(self, args, "updating WordPress options failed",
+                               input_data=script)
+    except SiteError:
+        Log.failed(self, f"Updating WordPress options {names}")
+        raise
+    Log.valide(self, f"Updating WordPress options {names}")
 
 
 def define_wp_constants(self, constants, data):
@@ -1319,20 +1477,27 @@ def define_wp_constants(self, constants, data):
     if not constants:
         return
 
-    webroot = data['webroot']
-    WOFileUtils.chdir(self, f'{webroot}/htdocs/')
-
+    commands = []
     for constant_name, constant_value in constants.items():
-        Log.wait(self, f"Defining WordPress constant {constant_name}")
         if isinstance(constant_value, bool):
             value = 'true' if constant_value else 'false'
-            cmd = build_wp_command("config set", constant_name, value, raw=True)
+            commands.append((['config', 'set', constant_name, value], ('raw',)))
         elif isinstance(constant_value, (int, float)):
-            cmd = build_wp_command("config set", constant_name, constant_value, raw=True)
+            commands.append((['config', 'set', constant_name, constant_value], ('raw',)))
         else:
-            cmd = build_wp_command("config set", constant_name, str(constant_value))
-        execute_command_safely(self, cmd, f"defining constant {constant_name} failed")
-        Log.valide(self, f"Defining WordPress constant {constant_name}")
+            commands.append((['config', 'set', constant_name, str(constant_value)], ()))
+
+    names = ", ".join(constants)
+    Log.wait(self, f"Defining WordPress constants {names}")
+    args, script = build_wp_batch(commands, skip_wordpress=True,
+                                  path=f"{data['webroot']}/htdocs")
+    try:
+        execute_command_safely(self, args, "defining WordPress constants failed",
+                               input_data=script)
+    except SiteError:
+        Log.failed(self, f"Defining WordPress constants {names}")
+        raise
+    Log.valide(self, f"Defining WordPress constants {names}")
 
 
 def apply_wp_template(self, data):
@@ -1341,7 +1506,13 @@ def apply_wp_template(self, data):
     if not template:
         return
 
-    themes = template.get('themes', [])
+    themes = template.get('themes') or ()
+    plugins = template.get('plugins') or ()
+    options = template.get('options') or {}
+    constants = template.get('constants') or {}
+    if not (themes or plugins or options or constants):
+        return
+
     for theme in themes:
         install_source = theme.get('url') or theme.get('source')
         activation_name = theme.get('slug') or theme.get('label')
@@ -1350,20 +1521,32 @@ def apply_wp_template(self, data):
                         network=theme.get('network'),
                         activation_name=activation_name)
 
-    plugins = template.get('plugins', [])
+    sources = []
+    activations = {}
     for plugin in plugins:
-        install_source = plugin.get('url') or plugin.get('source')
-        activation_name = plugin.get('slug') or plugin.get('label')
-        installwp_plugin(self, install_source, data,
-                         activate=plugin.get('activate', False),
-                         network=plugin.get('network'),
-                         activation_name=activation_name)
-        for option_name, option_value in plugin.get('options', {}).items():
-            plugin_payload = _serialise_wp_option_value(option_value)
-            setupwp_plugin(self, plugin['label'], option_name, plugin_payload, data)
+        sources.append(plugin.get('url') or plugin.get('source'))
+        if plugin.get('activate', False):
+            network = plugin.get('network')
+            network_flag = data.get('multisite') if network is None else network
+            activations.setdefault(bool(network_flag), []).append(
+                plugin.get('slug') or plugin.get('label'))
+
+    # One multi-source `wp plugin install` fetches them all: concurrent
+    # installs would share, and empty, wp-content/upgrade. Activation
+    # follows in one call per network mode
+    if sources:
+        installwp_plugins(self, sources, data)
 
-    update_wp_options(self, template.get('options'), data)
-    define_wp_constants(self, template.get('constants'), data)
+    for network_flag, names in activations.items():
+        activatewp_plugins(self, names, data, network=network_flag)
+
+    # Plugin settings and site options share one WordPress bootstrap
+    plugin_options = {plugin['label']: plugin['options']
+                      for plugin in plugins if plugin.get('options')}
+    if options or plugin_options:
+        update_wp_options(self, options, data, plugin_options=plugin_options)
+    if constants:
+        define_wp_constants(self, constants, data)
 
 
 def parse_wp_db_config(config_path):
@@ -1381,31 +1564,32 @@ def parse_wp_db_config(config_path):
         return creds
 
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if 'DB_NAME' in line and "'" in line:
-                    parts = line.split("'")
-                    if len(parts) >= 4:
-                        creds['DB_NAME'] = parts[3]
-                elif 'DB_USER' in line and "'" in line:
-                    parts = line.split("'")
-                    if len(parts) >= 4:
-                        creds['DB_USER'] = parts[3]
-                elif 'DB_PASSWORD' in line and "'" in line:
-                    parts = line.split("'")
-                    if len(parts) >= 4:
-                        creds['DB_PASSWORD'] = parts[3]
-                elif 'DB_HOST' in line and "'" in line:
-                    parts = line.split("'")
-                    if len(parts) >= 4:
-                        creds['DB_HOST'] = parts[3]
-    except (IOError, UnicodeDecodeError) as e:
-        # Return empty dict if file cannot be read
+        # O_NOATIME skips the atime write on mounts without relatime; it is
+        # only allowed for the file owner, so retry without it on EPERM
+        try:
+            fd = os.open(config_path, os.O_RDONLY | _O_NOATIME)
+        except PermissionError:
+            fd = os.open(config_path, os.O_RDONLY)
+        with os.fdopen(fd, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            # One pass of the regex engine over the whole file; PHP ignores
+            # a constant redefinition, so the first define wins
+            for key, _, value in _WP_DB_DEFINE_RE.findall(buf):
+                creds.setdefault(key.decode(), value.decode('utf-8', 'replace'))
+    except (IOError, ValueError):
+        # Return empty dict if file cannot be read (or is empty: mmap
+        # refuses zero-length files)
         return {}
 
     return creds
 
 
+@functools.lru_cache(maxsize=128)
+def _slug_pattern(slug):
+    """Compiled bytes pattern matching a site slug literally."""
+    return re.compile(re.escape(slug.encode()))
+
+
 def copy_nginx_acl_files(controller, src_slug, dest_slug, base_path='/etc/nginx/acl'):
     """
     Copy nginx ACL files from source to destination site.
@@ -1423,24 +1607,24 @@ def copy_nginx_acl_files(controller, src_slug, dest_slug, base_path='/etc/nginx/
         return
 
     try:
-        # Ensure base directory exists
-        os.makedirs(base_path, exist_ok=True)
-
-        # Remove existing destination if it exists
-        if os.path.exists(dest_acl):
-            WOFileUtils.rm(controller, dest_acl)
+        # Copy ACL files over whatever setupdomain left in place; files are
+        # overwritten in place and missing parents (base_path included) are
+        # created, so no rmtree or separate makedirs is needed
+        WOFileUtils.fast_copytree(controller, src_acl, dest_acl)
 
-        # Copy ACL files
-        WOFileUtils.copyfiles(controller, src_acl, dest_acl)
-
-        # Update protected.conf file if it exists
+        # Update protected.conf file if it exists; write a sibling file and
+        # rename it over the original so nginx never reads a torn file
         protected_file = os.path.join(dest_acl, 'protected.conf')
         if os.path.isfile(protected_file):
-            with open(protected_file, 'r', encoding='utf-8') as f:
+            # Work on raw bytes with the cached slug pattern, no decode/encode
+            with open(protected_file, 'rb') as f:
                 content = f.read()
-            content = content.replace(src_slug, dest_slug)
-            with open(protected_file, 'w', encoding='utf-8') as f:
+            content = _slug_pattern(src_slug).sub(dest_slug.encode(), content)
+            tmp_file = f"{protected_file}.tmp"
+            with open(tmp_file, 'wb') as f:
                 f.write(content)
+            shutil.copymode(protected_file, tmp_file)
+            os.replace(tmp_file, protected_file)
 
         Log.debug(controller, f"Copied ACL files from {src_acl} to {dest_acl}")
 
@@ -1459,8 +1643,6 @@ def extract_site_backup(controller, backup_path):
     Returns:
         str: Path to extracted backup directory
     """
-    import tempfile
-
     # If already a directory, return as-is
     if os.path.isdir(backup_path):
         return backup_path
@@ -1472,18 +1654,16 @@ def extract_site_backup(controller, backup_path):
     temp_dir = tempfile.mkdtemp(prefix='wo-restore-')
 
     try:
-        # Handle zstd compressed archives specifically for WordOps
-        if backup_path.endswith('.tar.zst'):
-            cmd = f"tar --zstd -xf '{backup_path}' -C '{temp_dir}'"
-        elif backup_path.endswith('.tar.gz') or backup_path.endswith('.tgz'):
-            cmd = f"tar -xzf '{backup_path}' -C '{temp_dir}'"
+        # Argument list, no shell: the backup path is never interpolated
+        if backup_path.endswith(('.tar.gz', '.tgz')):
+            cmd = ['tar', '-xzf', backup_path, '-C', temp_dir]
         elif backup_path.endswith('.tar'):
-            cmd = f"tar -xf '{backup_path}' -C '{temp_dir}'"
+            cmd = ['tar', '-xf', backup_path, '-C', temp_dir]
         elif backup_path.endswith('.zip'):
-            cmd = f"unzip -q '{backup_path}' -d '{temp_dir}'"
+            cmd = ['unzip', '-q', backup_path, '-d', temp_dir]
         else:
-            # Try zstd extraction as default for WordOps
-            cmd = f"tar --zstd -xf '{backup_path}' -C '{temp_dir}'"
+            # .tar.zst, and the default for WordOps backups
+            cmd = ['tar', '--zstd', '-xf', backup_path, '-C', temp_dir]
 
         try:
             execute_command_safely(controller, cmd, f"Failed to extract backup: {backup_path}")
@@ -1545,17 +1725,35 @@ def restore_database_from_dump(controller, dump_file, db_meta):
                 log=False,
             )
 
-        # Import the SQL dump
-        cmd = f'mariadb {db_name} < {dump_file}'
-        execute_command_safely(controller, cmd, "Database restoration failed", log_command=False)
+        # Import the SQL dump: the file is handed to the client as its
+        # stdin, so no shell parses the paths and Python never reads it
+        with open(dump_file, 'rb') as dump:
+            execute_command_safely(controller, ['mariadb', db_name],
+                                   "Database restoration failed",
+                                   log_command=False, stdin=dump)
 
         Log.info(controller, "Database restored successfully")
 
-    except (MySQLConnectionError, StatementExcecutionError, SiteError) as e:
+    except (MySQLConnectionError, StatementExcecutionError, SiteError, OSError) as e:
         Log.debug(controller, str(e))
         Log.warn(controller, 'Failed to restore database')
 
 
+# site_type -> (static, basic, wp, multisite, wpsubdir) for a cloned site
+_CLONE_STYPE_FLAGS = {
+    'html': (True, False, False, False, False),
+    'php': (False, True, False, False, False),
+    'wp': (False, True, True, False, False),
+    'wpsubdir': (False, True, True, True, True),
+    'wpsubdomain': (False, True, True, True, False),
+}
+
+
+# Site type and cache flags every clone starts with turned off
+_CLONE_FALSE_KEYS = ('static', 'wp', 'wpfc', 'wpsc', 'wprocket', 'wpce',
+                     'wpredis', 'multisite', 'wpsubdir')
+
+
 def build_clone_site_data(src_info, src_domain, dest_domain, wp_credentials, dest_type='domain'):
     """
     Build site data configuration for cloning.
@@ -1571,7 +1769,8 @@ def build_clone_site_data(src_info, src_domain, dest_domain, wp_credentials, des
         dict: Complete site configuration data
     """
     dest_webroot = os.path.join(WOVar.wo_webroot, dest_domain)
-    php_key = f"php{src_info.php_version}".replace('.', '')
+    php_ver = src_info.php_version.replace('.', '')
+    pool_name = dest_domain.replace('.', '-').lower()
     www_domain = f"www.{dest_domain}" if dest_type != 'subdomain' else ''
 
     # Base configuration
@@ -1579,20 +1778,12 @@ def build_clone_site_data(src_info, src_domain, dest_domain, wp_credentials, des
         'site_name': dest_domain,
         'www_domain': www_domain,
         'webroot': dest_webroot,
-        'static': False,
         'basic': True,
-        'wp': False,
-        'wpfc': False,
-        'wpsc': False,
-        'wprocket': False,
-        'wpce': False,
-        'wpredis': False,
-        'multisite': False,
-        'wpsubdir': False,
-        'wo_php': php_key,
-        'pool_name': dest_domain.replace('.', '-').lower(),
-        'php_ver': php_key.replace('php', ''),
-        'php_fpm_user': f"php-{dest_domain.replace('.', '-').lower()}",
+        **dict.fromkeys(_CLONE_FALSE_KEYS, False),
+        'wo_php': f"php{php_ver}",
+        'pool_name': pool_name,
+        'php_ver': php_ver,
+        'php_fpm_user': f"php-{pool_name}",
     }
 
     # Add WordPress credentials
@@ -1602,24 +1793,64 @@ def build_clone_site_data(src_info, src_domain, dest_domain, wp_credentials, des
     stype = src_info.site_type
     cache = src_info.cache_type if src_info.cache_type else 'basic'
 
-    if 'wp' in stype:
-        data['wp'] = True
-        data['basic'] = cache == 'basic'
-        if cache != 'basic':
-            data[cache] = True
-        data['multisite'] = stype in ['wpsubdir', 'wpsubdomain']
-        if stype == 'wpsubdir':
-            data['wpsubdir'] = True
-    elif stype.startswith('php') or stype == 'php':
-        data['static'] = False
-        data['basic'] = True
-    else:
-        data['static'] = True
+    flags = _CLONE_STYPE_FLAGS.get(stype)
+    if flags is None:
+        flags = _CLONE_STYPE_FLAGS['php' if stype.startswith('php') else 'html']
+    data.update(zip(('static', 'basic', 'wp', 'multisite', 'wpsubdir'), flags))
+    if data['wp'] and cache != 'basic':
         data['basic'] = False
+        data[cache] = True
 
     return data
 
 
+def _quote_identifier(name):
+    """Backtick-quote a MySQL table or column name."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def db_copy_tables(controller, src_db, dest_db):
+    """
+    Copy every table of src_db into dest_db on the same server with
+    ``CREATE TABLE ... LIKE`` and ``INSERT ... SELECT``.
+
+    Rows never leave the server. Reads run under READ COMMITTED, so
+    INSERT ... SELECT takes no shared locks and the live source site
+    keeps writing (transients, cron) during the copy. The price is that
+    each table is copied as of its own statement, not from one snapshot
+    of the whole database as mariadb-dump --single-transaction gives.
+
+    Returns:
+        bool: False, without copying anything, when the schema has views
+        or triggers, which only mariadb-dump reproduces
+    """
+    src, dest = _quote_identifier(src_db), _quote_identifier(dest_db)
+    connection = WOMysql.connect(controller)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SHOW FULL TABLES FROM {src}")
+            tables = cursor.fetchall()
+            cursor.execute("SELECT 1 FROM information_schema.TRIGGERS "
+                           "WHERE TRIGGER_SCHEMA = %s LIMIT 1", (src_db,))
+            if cursor.fetchone() or any(kind != 'BASE TABLE' for _, kind in tables):
+                return False
+
+            # CREATE TABLE commits implicitly, so create them all first and
+            # fill them in one transaction
+            for table, _ in tables:
+                table = _quote_identifier(table)
+                cursor.execute(f"CREATE TABLE {dest}.{table} LIKE {src}.{table}")
+            cursor.execute("SET foreign_key_checks = 0, unique_checks = 0")
+            cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            for table, _ in tables:
+                table = _quote_identifier(table)
+                cursor.execute(f"INSERT INTO {dest}.{table} SELECT * FROM {src}.{table}")
+        connection.commit()
+    finally:
+        connection.close()
+    return True
+
+
 def clone_database(controller, src_domain, src_db_config, dest_db_config):
     """
     Clone database from source to destination site.
@@ -1634,31 +1865,36 @@ def clone_database(controller, src_domain, src_db_config, dest_db_config):
         Log.info(controller, "No source database found to clone")
         return
 
-    # Create temporary backup file
-    backup_file = f"/tmp/{src_domain.replace('.', '_')}.sql"
-
-    try:
-        # Dump source database
-        dump_cmd = (
-            f"mariadb-dump --defaults-extra-file=/etc/mysql/conf.d/my.cnf "
-            f"--single-transaction --quick --add-drop-table --hex-blob "
-            f"{src_db_config['DB_NAME']} > {backup_file}"
-        )
-        execute_command_safely(controller, dump_cmd, "Failed to dump source database")
+    # Same server: copy the tables inside MariaDB, no dump is parsed at all
+    if src_db_config.get('DB_HOST', 'localhost') == dest_db_config.get('DB_HOST', 'localhost'):
+        try:
+            if db_copy_tables(controller, src_db_config['DB_NAME'],
+                              dest_db_config['DB_NAME']):
+                Log.info(controller, "Database cloned successfully")
+                return
+        except Exception as e:
+            Log.debug(controller, f"Server-side database copy failed, using mariadb-dump: {e}")
 
-        # Import to destination database
-        import_cmd = (
-            f"mariadb --defaults-extra-file=/etc/mysql/conf.d/my.cnf "
-            f"{dest_db_config['DB_NAME']} < {backup_file}"
-        )
-        execute_command_safely(controller, import_cmd, "Failed to import database to destination")
+    dump_cmd = [
+        'mariadb-dump', '--defaults-extra-file=/etc/mysql/conf.d/my.cnf',
+        '--single-transaction', '--quick', '--add-drop-table', '--hex-blob',
+        src_db_config['DB_NAME'],
+    ]
+    import_cmd = [
+        'mariadb', '--defaults-extra-file=/etc/mysql/conf.d/my.cnf',
+        dest_db_config['DB_NAME'],
+    ]
 
-        Log.info(controller, "Database cloned successfully")
+    # Stream the dump straight into the destination: the import overlaps
+    # the export and no SQL file is ever written to disk
+    try:
+        if not WOShellExec.cmd_exec_pipe(controller, dump_cmd, import_cmd):
+            raise SiteError(f"Failed to clone database of {src_domain}")
+    except CommandExecutionError as e:
+        Log.debug(controller, f"Database clone pipeline failed: {e}")
+        raise SiteError(f"Failed to clone database of {src_domain}")
 
-    finally:
-        # Clean up temporary backup file
-        if os.path.exists(backup_file):
-            WOFileUtils.rm(controller, backup_file)
+    Log.info(controller, "Database cloned successfully")
 
 
 def clone_website_files(controller, src_domain, dest_domain):
@@ -1677,18 +1913,102 @@ def clone_website_files(controller, src_domain, dest_domain):
         raise SiteError(f"Source website files not found: {src_root}")
 
     Log.info(controller, f"Copying website files from {src_domain} to {dest_domain}")
-    WOFileUtils.copyfiles(controller, src_root, dest_root, overwrite=True)
+    # setupdomain leaves an empty htdocs behind; fast_copytree reuses
+    # existing directories and truncates existing files, so copy straight
+    # into it instead of deleting and recreating it
+    WOFileUtils.fast_copytree(controller, src_root, dest_root)
+
+
+# Column types scanned by db_search_replace
+_TEXT_COLUMN_TYPES = ('char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext')
 
+# PHP serialize() output embeds byte lengths, so values starting like this
+# cannot be rewritten with a plain REPLACE() when the length changes
+_SERIALIZED_LIKE = ('a:%', 'O:%', 's:%', 'C:%')
 
-def update_wordpress_urls(controller, src_domain, dest_domain, dest_webroot):
+
+def db_search_replace(controller, db_name, search, replace, skip_columns=('guid',)):
     """
-    Update WordPress URLs in database using WP-CLI.
+    Replace a literal string in every text column with server-side
+    ``UPDATE ... SET col = REPLACE(col, ...)`` statements.
+
+    When search and replace differ in byte length, tables holding a match
+    inside a PHP-serialized value are left untouched and returned so the
+    caller can hand them to wp-cli, which fixes the embedded lengths.
+    All updates run in one transaction.
+
+    Args:
+        controller: Controller instance
+        db_name (str): Database to rewrite
+        search (str): Literal string to find
+        replace (str): Replacement string
+        skip_columns (tuple): Column names never rewritten
+
+    Returns:
+        list: Tables left for a serialization-aware search-replace
+    """
+    like = '%' + (search.replace('\\', '\\\\').replace('%', '\\%')
+                  .replace('_', '\\_')) + '%'
+    same_length = len(search.encode()) == len(replace.encode())
+
+    connection = WOMysql.dbConnection(controller, db_name)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = %s AND DATA_TYPE IN %s",
+                (db_name, _TEXT_COLUMN_TYPES))
+            columns = [(table, column) for table, column in cursor.fetchall()
+                       if column not in skip_columns]
+
+            serialized_tables = set()
+            if not same_length:
+                serialized = ' OR '.join(['{col} LIKE %s'] * len(_SERIALIZED_LIKE))
+                for table, column in columns:
+                    if table in serialized_tables:
+                        continue
+                    col = _quote_identifier(column)
+                    cursor.execute(
+                        f"SELECT 1 FROM {_quote_identifier(table)} "
+                        f"WHERE {col} LIKE %s AND ({serialized.format(col=col)}) LIMIT 1",
+                        (like, *_SERIALIZED_LIKE))
+                    if cursor.fetchone():
+                        serialized_tables.add(table)
+
+            for table, column in columns:
+                if table in serialized_tables:
+                    continue
+                col = _quote_identifier(column)
+                cursor.execute(
+                    f"UPDATE {_quote_identifier(table)} SET {col} = REPLACE({col}, %s, %s) "
+                    f"WHERE {col} LIKE %s",
+                    (search, replace, like))
+        connection.commit()
+    finally:
+        connection.close()
+
+    return sorted(serialized_tables)
+
+
+def update_wordpress_urls(controller, src_domain, dest_domain, dest_webroot, multisite=False,
+                          db_name=None):
+    """
+    Update WordPress URLs in the destination database.
+
+    With ``db_name`` the replacement runs server-side (db_search_replace)
+    and wp-cli only handles tables holding serialized matches; without it,
+    or if the server-side pass fails, wp-cli rewrites every table.
+
+    Post GUIDs are left untouched (they must stay stable for feed readers),
+    which also spares wp-cli a pass over the largest column of wp_posts.
 
     Args:
         controller: Controller instance
         src_domain (str): Source domain name
         dest_domain (str): Destination domain name
         dest_webroot (str): Destination webroot path
+        multisite (bool): Run the replacement across the whole network
+        db_name (str): Destination database name
     """
     dest_htdocs = os.path.join(dest_webroot, 'htdocs')
 
@@ -1696,7 +2016,25 @@ def update_wordpress_urls(controller, src_domain, dest_domain, dest_webroot):
         raise SiteError(f"Destination htdocs not found: {dest_htdocs}")
 
     Log.info(controller, f"Updating WordPress URLs from {src_domain} to {dest_domain}")
-    cmd = f"{WOVar.wo_wpcli_path} search-replace {src_domain} {dest_domain} --path={dest_htdocs} --all-tables --allow-root"
+
+    tables = None
+    if db_name:
+        try:
+            tables = db_search_replace(controller, db_name, src_domain, dest_domain)
+        except Exception as e:
+            Log.debug(controller, f"Server-side search-replace failed, using wp-cli: {e}")
+        else:
+            if not tables:
+                return
+
+    cmd = [WOVar.wo_wpcli_path, 'search-replace', src_domain, dest_domain]
+    if tables:
+        cmd.extend(tables)
+    cmd += [f'--path={dest_htdocs}', '--skip-columns=guid', '--allow-root']
+    if not tables:
+        cmd.append('--all-tables')
+        if multisite:
+            cmd.append('--network')
     execute_command_safely(controller, cmd, "Failed to update WordPress URLs")
 
 
@@ -1859,11 +2197,16 @@ def sitebackup(self, data, move_files=True, db_only=False, files_only=False):
     if data['wo_db_name'] and not files_only:
         Log.info(self, 'Backing up database \t\t', end='')
         try:
-            if not WOShellExec.cmd_exec(
-                self, "mysqldump --single-transaction --hex-blob "
-                "{0} | zstd -c > {1}/{0}.zst"
-                .format(data['wo_db_name'],
-                        backup_path)):
+            # mysqldump -> zstd through a plain pipe, no intermediate shell
+            with open(os.path.join(backup_path,
+                                   "{0}.zst".format(data['wo_db_name'])),
+                      'wb') as dump:
+                dumped = WOShellExec.cmd_exec_pipe(
+                    self,
+                    ['mysqldump', '--single-transaction', '--hex-blob',
+                     data['wo_db_name']],
+                    ['zstd', '-c'], stdout=dump)
+            if not dumped:
                 Log.info(self,
                          "[" + Log.ENDC + Log.FAIL + "Fail" + Log.OKBLUE + "]")
                 raise SiteError("mysqldump failed to backup database")
@@ -2246,9 +2589,9 @@ def generate_random(length=24, charset=None):
     if charset is None:
         charset = string.ascii_uppercase + string.ascii_lowercase + string.digits
 
-    # Ensure we don't try to sample more characters than available
-    actual_length = min(length, len(charset))
-    return ''.join(random.sample(charset, actual_length))
+    # Independent CSPRNG draws: characters may repeat, so the length is
+    # not capped by the charset size
+    return ''.join(secrets.choice(charset) for _ in range(length))
 
 
 # Backward compatibility wrappers (can be removed after updating all references)
@@ -2816,6 +3159,7 @@ def create_site_archive(controller, domain_dir, timestamp):
         if WOShellExec.cmd_exec(controller, f"tar --zstd -cf {archive} -C {domain_dir} {timestamp}"):
             WOFileUtils.remove(controller, [target_dir])
             Log.debug(controller, f"Archive created: {archive}")
+            write_archive_checksum(controller, archive)
             return True
         else:
             Log.warn(controller, 'Failed to create backup archive')
@@ -2826,6 +3170,30 @@ def create_site_archive(controller, domain_dir, timestamp):
         return False
 
 
+def write_archive_checksum(controller, archive):
+    """Write a sha256sum-compatible ``<archive>.sha256`` sidecar.
+
+    The archive was just written, so it is hashed from the page cache;
+    hashlib uses OpenSSL's SHA-NI code path where the CPU supports it.
+
+    Returns:
+        str: Hex digest, or None if the sidecar could not be written
+    """
+    try:
+        sha256 = hashlib.sha256()
+        with open(archive, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        with open(f'{archive}.sha256', 'w', encoding='utf-8') as f:
+            f.write(f"{digest}  {os.path.basename(archive)}\n")
+    except OSError as e:
+        Log.debug(controller, f"Archive checksum error: {str(e)}")
+        return None
+    Log.debug(controller, f"Archive checksum: {digest}")
+    return digest
+
+
 def handle_site_error_cleanup(self, domain, webroot, db_name=None, db_user=None, db_host=None):
     """
     Standardized error cleanup for site creation failures
@@ -168,6 +168,9 @@ class WOSiteUpdateController(CementBaseController):
                 "redis_prefix": "nginx-cache:"
             }
             plugin_data = json.dumps(plugin_data_object)
+            if enable_purge:
+                # Plain WordPress sites are created without nginx-helper
+                installwp_plugin(self, 'nginx-helper', data)
             setupwp_plugin(self, 'nginx-helper',
                           'rt_wp_nginx_helper_options',
                           plugin_data, data)
@@ -390,8 +393,8 @@ class WOSiteUpdateController(CementBaseController):
                 currsitetype=oldsitetype, currcachetype=oldcachetype)
 
             # Add PHP version flags dynamically instead of hardcoding
-            for php_ver in PHPVersionManager.SUPPORTED_VERSIONS:
-                data[php_ver] = False
+            data.update(dict.fromkeys(PHPVersionManager.SUPPORTED_VERSIONS,
+                                      False))
 
         elif stype in ['mysql', 'wp', 'wpsubdir', 'wpsubdomain']:
             data = dict(
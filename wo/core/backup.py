@@ -19,10 +19,10 @@ Usage:
     )
 """
 
-import glob
 import json
 import os
-from datetime import datetime
+import shutil
+import time
 from typing import Optional, Tuple, Dict, Any
 
 from wo.core.fileutils import WOFileUtils
@@ -34,6 +34,18 @@ from wo.cli.plugins.site_functions import (
     create_site_archive,
 )
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _dump_json(data: Dict[str, Any]) -> bytes:
+    """Serialize backup metadata to indented UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str)
+    return json.dumps(data, default=str, indent=2, ensure_ascii=False).encode('utf-8')
+
 
 class WOBackup:
     """Centralized backup service for WordOps sites."""
@@ -56,8 +68,10 @@ class WOBackup:
 
     @staticmethod
     def _timestamp():
-        """Generate consistent timestamp format."""
-        return datetime.utcnow().strftime('%Y-%m-%d_%H-%M-%S')
+        """Generate consistent UTC timestamp format."""
+        t = time.gmtime()
+        return (f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}_"
+                f"{t.tm_hour:02d}-{t.tm_min:02d}-{t.tm_sec:02d}")
 
     def create(
         self,
@@ -148,16 +162,17 @@ class WOBackup:
         """
         success = True
 
-        # Backup htdocs directory
+        # Backup htdocs directory; a site without htdocs is not an error
         htdocs_src = os.path.join(self.siteinfo.site_path, 'htdocs')
-        if os.path.isdir(htdocs_src):
-            htdocs_dest = os.path.join(target_dir, 'htdocs')
-            try:
-                WOFileUtils.copyfiles(self.controller, htdocs_src, htdocs_dest)
-                Log.debug(self.controller, f"Backed up htdocs to {htdocs_dest}")
-            except Exception as e:
-                Log.warn(self.controller, f'Failed to backup htdocs: {str(e)}')
-                success = False
+        htdocs_dest = os.path.join(target_dir, 'htdocs')
+        try:
+            shutil.copytree(htdocs_src, htdocs_dest)
+            Log.debug(self.controller, f"Backed up htdocs to {htdocs_dest}")
+        except FileNotFoundError:
+            Log.debug(self.controller, f"No htdocs found in {self.siteinfo.site_path}")
+        except Exception as e:
+            Log.warn(self.controller, f'Failed to backup htdocs: {str(e)}')
+            success = False
 
         # Backup configuration file(s)
         config_file = self._find_config_file()
@@ -181,9 +196,13 @@ class WOBackup:
         site_path = self.siteinfo.site_path
 
         # Look for *-config.php files first (WordOps pattern)
-        configs = glob.glob(os.path.join(site_path, '*-config.php'))
-        if configs:
-            return configs[0]
+        try:
+            with os.scandir(site_path) as entries:
+                for entry in entries:
+                    if entry.name.endswith('-config.php') and entry.is_file():
+                        return entry.path
+        except OSError:
+            pass
 
         # Look for wp-config.php in htdocs (WordPress standard)
         wp_config = os.path.join(site_path, 'htdocs', 'wp-config.php')
@@ -214,7 +233,7 @@ class WOBackup:
 
             # Add timestamp if not already provided
             if not extra or 'timestamp' not in extra:
-                metadata['timestamp'] = datetime.utcnow().strftime('%Y-%m-%d_%H-%M-%S')
+                metadata['timestamp'] = self._timestamp()
 
             # Merge extra metadata if provided
             if extra:
@@ -222,8 +241,8 @@ class WOBackup:
 
             # Save to vhost.json
             metadata_file = os.path.join(target_dir, 'vhost.json')
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, default=str, indent=2)
+            with open(metadata_file, 'wb') as f:
+                f.write(_dump_json(metadata))
 
             Log.debug(self.controller, f"Saved metadata to {metadata_file}")
             return True
@@ -244,13 +263,19 @@ class WOBackup:
             List of backup archive paths, sorted by timestamp (newest first)
         """
         domain_dir = os.path.join(backup_root, site_name)
-        if not os.path.isdir(domain_dir):
+
+        # Single directory pass; DirEntry caches the stat used for sorting
+        try:
+            with os.scandir(domain_dir) as entries:
+                archives = [(entry.stat().st_mtime, entry.path)
+                            for entry in entries
+                            if entry.name.endswith('.tar.zst') and entry.is_file()]
+        except OSError:
             return []
 
-        archives = glob.glob(os.path.join(domain_dir, '*.tar.zst'))
         # Sort by modification time, newest first
-        archives.sort(key=os.path.getmtime, reverse=True)
-        return archives
+        archives.sort(reverse=True)
+        return [path for _, path in archives]
 
     @staticmethod
     def get_backup_info(archive_path: str) -> Optional[Dict[str, Any]]:
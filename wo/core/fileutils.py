@@ -6,8 +6,83 @@ import shutil
 import codecs
 import errno
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
 from wo.core.logging import Log
 
+# copy_file_range/sendfile chunk size; the kernel caps a single call anyway
+_COPY_CHUNK = 1 << 30
+# errors meaning "copy_file_range not usable here", retried with sendfile
+_COPY_FALLBACK_ERRNOS = (errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                         errno.EOPNOTSUPP)
+# _IOW(0x94, 9, int): share the source extents with the destination (CoW)
+_FICLONE = 0x40049409
+# errors meaning "no reflink here" (other filesystem, ext4, ...)
+_REFLINK_FALLBACK_ERRNOS = _COPY_FALLBACK_ERRNOS + (errno.ENOTTY, errno.EPERM)
+
+
+def _copy_file_kernel(src, dst, mode, reflink=False):
+    """Copy file contents without user-space buffers.
+
+    With ``reflink`` a FICLONE ioctl is tried first, which shares the whole
+    extent tree in one call on btrfs/XFS. Otherwise, or when it is refused,
+    copy_file_range is used, then sendfile.
+    """
+    sfd = os.open(src, os.O_RDONLY)
+    try:
+        dfd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        try:
+            if reflink and fcntl is not None:
+                try:
+                    fcntl.ioctl(dfd, _FICLONE, sfd)
+                    return
+                except OSError as e:
+                    if e.errno not in _REFLINK_FALLBACK_ERRNOS:
+                        raise
+            try:
+                if not hasattr(os, 'copy_file_range'):
+                    raise OSError(errno.ENOSYS, 'copy_file_range unavailable')
+                while os.copy_file_range(sfd, dfd, _COPY_CHUNK):
+                    pass
+            except OSError as e:
+                if e.errno not in _COPY_FALLBACK_ERRNOS:
+                    raise
+                # both offsets already advanced past what was copied
+                while os.sendfile(dfd, sfd, None, _COPY_CHUNK):
+                    pass
+        finally:
+            os.close(dfd)
+    finally:
+        os.close(sfd)
+
+
+def _fast_copytree(controller, src, dst, reflink=None):
+    """Recursive copytree built on os.scandir and _copy_file_kernel.
+
+    Only directories and regular files (or symlinks to them) are copied;
+    sockets, FIFOs and dangling symlinks are skipped with a debug message.
+    """
+    os.makedirs(dst, exist_ok=True)
+    if reflink is None:
+        # reflinks only work within one filesystem; check once per tree
+        reflink = os.stat(src).st_dev == os.stat(dst).st_dev
+    with os.scandir(src) as entries:
+        for entry in entries:
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                _fast_copytree(controller, entry.path, target, reflink)
+            elif entry.is_file():
+                _copy_file_kernel(entry.path, target, entry.stat().st_mode,
+                                  reflink)
+                shutil.copystat(entry.path, target)
+            else:
+                Log.debug(controller, "Skipping {0}: not a regular file "
+                          "or directory".format(entry.path))
+    shutil.copystat(src, dst)
+
 
 class WOFileUtils():
     """Utilities to operate on files"""
@@ -40,16 +115,20 @@ class WOFileUtils():
         """
         src = paths[0]
         dst = paths[1]
-        if not os.path.islink(dst):
-            try:
-                Log.debug(self, "Creating Symbolic link, Source:{0}, Dest:{1}"
-                          .format(src, dst))
-                os.symlink(src, dst)
-            except OSError as e:
+        # Try the link first; dst is only inspected when it already exists
+        try:
+            Log.debug(self, "Creating Symbolic link, Source:{0}, Dest:{1}"
+                      .format(src, dst))
+            os.symlink(src, dst)
+        except FileExistsError as e:
+            if os.path.islink(dst):
+                Log.debug(self, "Destination: {0} exists".format(dst))
+            else:
                 Log.debug(self, "{0}{1}".format(e.errno, e.strerror))
                 Log.error(self, "Unable to create symbolic link ...\n ")
-        else:
-            Log.debug(self, "Destination: {0} exists".format(dst))
+        except OSError as e:
+            Log.debug(self, "{0}{1}".format(e.errno, e.strerror))
+            Log.error(self, "Unable to create symbolic link ...\n ")
 
     def remove_symlink(self, filepath):
         """
@@ -90,6 +169,28 @@ class WOFileUtils():
             Log.error(self, "Unable to copy files from {0} to {1}"
                       .format(src, dest), exit=False)
 
+    def fast_copytree(self, src, dest):
+        """
+        Copies files with in-kernel copies:
+            src : source path
+            dest : destination path
+
+            Same result as copyfiles, but file data is reflinked with
+            FICLONE when source and destination share a CoW filesystem
+            (btrfs/XFS), else moved with copy_file_range or sendfile
+            instead of read/write through user space. Symlinks are
+            followed like copyfiles does; sockets, FIFOs and dangling
+            symlinks are skipped and logged at debug level.
+        """
+        try:
+            Log.debug(self, "Fast copying files, Source:{0}, Dest:{1}"
+                      .format(src, dest))
+            _fast_copytree(self, src, dest)
+        except OSError as e:
+            Log.debug(self, "{0}".format(e))
+            Log.error(self, 'Unable to copy files from {0} to {1}'
+                      .format(src, dest))
+
     def copyfile(self, src, dest):
         """
         Copy file:
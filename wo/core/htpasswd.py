@@ -0,0 +1,72 @@
+"""WordOps htpasswd helpers"""
+import grp
+import hashlib
+import os
+import secrets
+
+_ITOA64 = './0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+
+def _to64(value, length):
+    out = ''
+    for _ in range(length):
+        out += _ITOA64[value & 0x3f]
+        value >>= 6
+    return out
+
+
+def apr1_crypt(password, salt=None):
+    """Hash password with Apache's $apr1$ MD5-crypt.
+
+    Produces the same output as ``openssl passwd -apr1`` (nginx verifies
+    it natively) without spawning a process.
+    """
+    if salt is None:
+        salt = ''.join(secrets.choice(_ITOA64) for _ in range(8))
+    magic = b'$apr1$'
+    pw = password.encode('utf-8')
+    salt_b = salt.encode('ascii')[:8]
+
+    ctx = pw + magic + salt_b
+    alt = hashlib.md5(pw + salt_b + pw).digest()
+    for remaining in range(len(pw), 0, -16):
+        ctx += alt[:min(16, remaining)]
+    i = len(pw)
+    while i:
+        ctx += b'\x00' if i & 1 else pw[:1]
+        i >>= 1
+    final = hashlib.md5(ctx).digest()
+
+    for i in range(1000):
+        rnd = pw if i & 1 else final
+        if i % 3:
+            rnd += salt_b
+        if i % 7:
+            rnd += pw
+        rnd += final if i & 1 else pw
+        final = hashlib.md5(rnd).digest()
+
+    encoded = ''
+    for a, b, c in ((0, 6, 12), (1, 7, 13), (2, 8, 14), (3, 9, 15), (4, 10, 5)):
+        encoded += _to64((final[a] << 16) | (final[b] << 8) | final[c], 4)
+    encoded += _to64(final[11], 2)
+    return f"$apr1${salt_b.decode('ascii')}${encoded}"
+
+
+def write_htpasswd(path, username, password, group=None):
+    """Write a single-user htpasswd file with an $apr1$ hash.
+
+    The file is created 0640, owned by ``group`` when given so nginx
+    workers can read it, and a symlink at ``path`` is refused.
+    """
+    payload = f"{username}:{apr1_crypt(password)}\n".encode('utf-8')
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC |
+                 os.O_CLOEXEC | os.O_NOFOLLOW, 0o640)
+    try:
+        # An existing file keeps its mode on O_TRUNC
+        os.fchmod(fd, 0o640)
+        if group:
+            os.fchown(fd, -1, grp.getgrnam(group).gr_gid)
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
@@ -4,6 +4,7 @@ from os.path import expanduser
 
 import pymysql
 from pymysql import DatabaseError, Error, connections
+from pymysql.constants import ER
 
 from wo.core.logging import Log
 from wo.core.variables import WOVar
@@ -25,6 +26,11 @@ class DatabaseNotExistsError(Exception):
     pass
 
 
+class DatabaseExistsError(StatementExcecutionError):
+    """Custom Exception when a created Database already Exists"""
+    pass
+
+
 class WOMysql():
     """Method for MySQL connection"""
 
@@ -89,6 +95,31 @@ class WOMysql():
         finally:
             connection.close()
 
+    def execute_many(self, statements, log=True):
+        """Execute statements in order over a single connection.
+
+        Saves a connect and authentication per statement. On failure
+        StatementExcecutionError carries the index of the failing
+        statement; the ones before it have already run. A create
+        database on an existing name raises DatabaseExistsError.
+        """
+        connection = WOMysql.connect(self)
+        try:
+            cursor = connection.cursor()
+            for index, statement in enumerate(statements):
+                log and Log.debug(self, "Executing MySQL Statement : {0}"
+                                  .format(statement))
+                try:
+                    cursor.execute(statement)
+                except Error as e:
+                    Log.debug(self, str(e))
+                    if e.args and e.args[0] == ER.DB_CREATE_EXISTS:
+                        raise DatabaseExistsError(index)
+                    raise StatementExcecutionError(index)
+            connection.commit()
+        finally:
+            connection.close()
+
     def backupAll(self, fulldump=False):
         import subprocess
         try:
@@ -2,12 +2,47 @@
 import fileinput
 import math
 import os
+import re
 import subprocess
 
 from wo.core.fileutils import WOFileUtils
 
+_BUCKET_SIZE_RE = re.compile(
+    rb'^\s*server_names_hash_bucket_size\s+(\d+)\s*;', re.MULTILINE)
+
+
+def _configured_bucket_size():
+    """Return the server_names_hash_bucket_size nginx is set to, or None."""
+    for conf in ("/etc/nginx/conf.d/hashbucket.conf", "/etc/nginx/nginx.conf"):
+        try:
+            with open(conf, 'rb') as f:
+                match = _BUCKET_SIZE_RE.search(f.read())
+        except OSError:
+            continue
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def _fits_bucket(server_name, bucket_size):
+    """Whether nginx can store server_name in a bucket of bucket_size.
+
+    Mirrors NGX_HASH_ELT_SIZE (value pointer, 2-byte length and the name,
+    pointer aligned) plus the pointer-sized bucket terminator.
+    """
+    ptr = 8
+    elt = ptr + ((len(server_name) + 2 + ptr - 1) & ~(ptr - 1))
+    return elt + ptr <= bucket_size
+
+
+def hashbucket(self, server_name=None):
+    # A new name that fits the configured bucket needs no resize, so skip
+    # the full `nginx -t` config parse used to detect the error
+    if server_name:
+        bucket_size = _configured_bucket_size()
+        if bucket_size and _fits_bucket(f"www.{server_name}", bucket_size):
+            return True
 
-def hashbucket(self):
     # Check Nginx Hashbucket error
     sub = subprocess.Popen('nginx -t', stdout=subprocess.PIPE,
                            stderr=subprocess.PIPE, shell=True)
@@ -1,6 +1,6 @@
 """WordOps Shell Functions"""
-import subprocess, re
-from typing import Union, Sequence, Optional, Mapping
+import subprocess, re, tempfile
+from typing import IO, Union, Sequence, Optional, Mapping
 
 from wo.core.logging import Log
 
@@ -39,8 +39,14 @@ class WOShellExec:
         cwd: Optional[str] = None,
         env: Optional[Mapping[str, str]] = None,
         shell_executable: Optional[str] = None,
+        stdin: Optional[IO] = None,
+        stdout: Optional[IO] = None,
     ) -> bool:
-        """Run a shell command. Strings run via shell; sequences run without shell."""
+        """Run a shell command. Strings run via shell; sequences run without shell.
+
+        ``stdin``/``stdout`` accept open file objects so argv commands can
+        redirect to or from files without going through ``sh -c``.
+        """
         try:
             use_shell = isinstance(command, str)
             if log:
@@ -50,10 +56,12 @@ class WOShellExec:
             proc = subprocess.run(
                 command,
                 input=input_data,
+                stdin=stdin,
+                stdout=stdout if stdout is not None else subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
                 encoding="utf-8",
                 errors="replace",
-                capture_output=True,
                 shell=use_shell,
                 executable=(shell_executable if use_shell and shell_executable else None),
                 cwd=cwd,
@@ -61,10 +69,11 @@ class WOShellExec:
                 timeout=timeout,
             )
 
+            output = proc.stdout or ''
             if proc.stderr.strip():
-                Log.debug(controller, f"Command Output: {proc.stdout}, \nCommand Error: {proc.stderr}")
+                Log.debug(controller, f"Command Output: {output}, \nCommand Error: {proc.stderr}")
             else:
-                Log.debug(controller, f"Command Output: {proc.stdout}")
+                Log.debug(controller, f"Command Output: {output}")
 
             if proc.returncode != 0 and errormsg:
                 Log.error(controller, errormsg)
@@ -83,6 +92,64 @@ class WOShellExec:
             Log.debug(controller, str(e))
             raise CommandExecutionError
 
+    @staticmethod
+    def cmd_exec_pipe(
+        controller,
+        producer: Sequence[str],
+        consumer: Sequence[str],
+        errormsg: str = '',
+        log: bool = True,
+        stdout: Optional[IO] = None,
+    ) -> bool:
+        """Run ``producer | consumer`` as two argv commands joined by a pipe.
+
+        Data flows through the kernel pipe buffer only; nothing is spooled
+        to disk and no shell is spawned. ``stdout`` receives the consumer's
+        output directly (like a shell ``>``). Succeeds when both commands
+        exit 0.
+        """
+        try:
+            if log:
+                shown = f"{' '.join(map(str, producer))} | {' '.join(map(str, consumer))}"
+                if stdout is not None:
+                    shown += f" > {getattr(stdout, 'name', stdout)}"
+                Log.debug(controller, f"Running command: {WOShellExec._redact(shown)}")
+
+            # producer stderr goes to a file so it can never fill a pipe and stall
+            with tempfile.TemporaryFile() as producer_err:
+                with subprocess.Popen(producer, stdout=subprocess.PIPE,
+                                      stderr=producer_err) as prod:
+                    with subprocess.Popen(consumer, stdin=prod.stdout,
+                                          stdout=stdout if stdout is not None
+                                          else subprocess.PIPE,
+                                          stderr=subprocess.PIPE) as cons:
+                        # let the producer get SIGPIPE if the consumer exits early
+                        prod.stdout.close()
+                        out, err = cons.communicate()
+                    prod.wait()
+                producer_err.seek(0)
+                prod_err = producer_err.read()
+
+            stderr = b"\n".join(e for e in (prod_err.strip(), err.strip()) if e)
+            output = (out or b"").decode("utf-8", "replace")
+            if stderr:
+                Log.debug(controller, f"Command Output: {output}, \nCommand Error: "
+                                      f"{stderr.decode('utf-8', 'replace')}")
+            else:
+                Log.debug(controller, f"Command Output: {output}")
+
+            ok = prod.returncode == 0 and cons.returncode == 0
+            if not ok and errormsg:
+                Log.error(controller, errormsg)
+            return ok
+
+        except OSError as e:
+            Log.debug(controller, str(e))
+            raise CommandExecutionError
+        except Exception as e:
+            Log.debug(controller, str(e))
+            raise CommandExecutionError
+
     @staticmethod
     def invoke_editor(self, filepath, errormsg=''):
         """